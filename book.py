@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from game import Game
+from index import WordleIndex
+from patterns import PATTERNS_CACHE_DIR, Patterns
+from repl import GuessMode, recommend
+
+BOOK_VERSION = 3
+
+# lookahead answers depend on its time budget and the machine, so it is left to search live
+BOOK_MODES = [GuessMode.ELIMINATE, GuessMode.FINISH, GuessMode.ENTROPY, GuessMode.MINIMAX]
+
+# the first two recommendations of every book mode, keyed by the mode asked for rather than the
+# mode a game started in, so mode switches (manual or to finish) land on the right entry:
+#   first[mode]                         the guess for an untouched game
+#   second[mode][(first, pattern)]      the guess and candidate count after any mode's first guess
+class OpeningBook:
+    def __init__(self, first: Dict[GuessMode, int], second: Dict[GuessMode, Dict[Tuple[int, int], Tuple[int, int]]]):
+        self.first = first
+        self.second = second
+
+    def __len__(self):
+        return len(self.first) + sum(len(entries) for entries in self.second.values())
+
+    # path is the (guess, pattern) of every turn played so far
+    def lookup(self, mode: GuessMode, path) -> Optional[int]:
+        if len(path) == 0:
+            return self.first.get(mode)
+        elif len(path) == 1:
+            entry = self.second.get(mode, {}).get(path[0])
+            return None if entry is None else entry[0]
+        return None
+
+def book_key(index: WordleIndex):
+    return hashlib.sha256(f"{BOOK_VERSION}\n".encode('utf-8') + index.digest()).hexdigest()[:16]
+
+def build_opening_book(index: WordleIndex, patterns: Patterns):
+    first = {mode: recommend(Game(index, patterns=patterns), mode) for mode in BOOK_MODES}
+    second = {mode: {} for mode in BOOK_MODES}
+    for guess in sorted(set(first.values())):
+        for pattern in np.unique(patterns.matrix[guess]).tolist():
+            game = Game(index, patterns=patterns)
+            game.apply_pattern(guess, pattern)
+            count = game.candidate_count
+            if count == 0:
+                continue
+            for mode in BOOK_MODES:
+                second[mode][(guess, pattern)] = (recommend(game, mode), count)
+    return OpeningBook(first, second)
+
+def fetch_opening_book(index: WordleIndex, patterns: Patterns, cache_dir=PATTERNS_CACHE_DIR):
+    path = opening_book_path(index, cache_dir)
+    if os.path.exists(path):
+        return read_opening_book(path, index)
+    book = build_opening_book(index, patterns)
+    write_opening_book(path, index, book)
+    return book
+
+def opening_book_path(index: WordleIndex, cache_dir=PATTERNS_CACHE_DIR):
+    return os.path.join(cache_dir, f'opening-book-{book_key(index)}.json')
+
+# wordles are stored as strings so the file stays readable and independent of rank order
+def read_opening_book(path, index: WordleIndex):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    first = {GuessMode[name.upper()]: index.wordle_to_i[wordle] for name, wordle in data['first'].items()}
+    second = {
+        GuessMode[name.upper()]: {
+            (index.wordle_to_i[guess], int(pattern)): (index.wordle_to_i[wordle], count)
+            for guess, patterns in by_guess.items()
+            for pattern, (wordle, count) in patterns.items()
+        }
+        for name, by_guess in data['second'].items()
+    }
+    return OpeningBook(first, second)
+
+def write_opening_book(path, index: WordleIndex, book: OpeningBook):
+    second = {}
+    for mode, entries in book.second.items():
+        by_guess = second[mode.name.lower()] = {}
+        for (guess, pattern), (wordle, count) in sorted(entries.items()):
+            by_guess.setdefault(index.wordles[guess], {})[str(pattern)] = [index.wordles[wordle], count]
+    data = {
+        'version': BOOK_VERSION,
+        'first': {mode.name.lower(): index.wordles[guess] for mode, guess in book.first.items()},
+        'second': second,
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
@@ -0,0 +1,87 @@
+import hashlib
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from frequency import FrequencyModel
+from index import WordleIndex
+from patterns import wordles_to_array
+
+BUNDLE_MAGIC = b'WRDLBNDL'
+BUNDLE_CACHE_DIR = 'data/cache'
+BUNDLE_VERSION = 2
+# sources are hashed a block at a time so a large corpus never sits in memory whole
+CHECKSUM_BLOCK_BYTES = 1 << 20
+
+# magic, version, wordle length, wordle count, checksum of the source csvs
+_HEADER = struct.Struct('<8sIII32s')
+
+# the layout after the header, each array starting on an 8 byte boundary:
+#   letters            uint8 (count, length)  wordles in rank order, a = 0
+#   scores             int64 (count,)         letter frequency score of each wordle
+#   usages             int64 (count,)         usage count of each wordle, -1 when unknown
+class Bundle:
+    def __init__(self, buffer):
+        _, _, length, count, self.checksum = _HEADER.unpack_from(buffer)
+        offset = _align(_HEADER.size)
+        self.letters = np.frombuffer(buffer, dtype=np.uint8, count=count * length, offset=offset).reshape(count, length)
+        offset = _align(offset + count * length)
+        self.scores = np.frombuffer(buffer, dtype=np.int64, count=count, offset=offset)
+        offset += self.scores.nbytes
+        self.usages = np.frombuffer(buffer, dtype=np.int64, count=count, offset=offset)
+
+    @property
+    def wordles(self):
+        text = (self.letters + ord('a')).tobytes().decode('ascii')
+        length = self.letters.shape[1]
+        return [text[start:start + length] for start in range(0, len(text), length)]
+
+    def to_index(self, min_usage):
+        wordles = self.wordles
+        wordle_to_usage = {wordle: usage for wordle, usage in zip(wordles, self.usages.tolist()) if usage >= min_usage}
+        return WordleIndex(wordles, FrequencyModel(self.letters), wordle_to_usage, scores=self.scores.tolist(), length=self.letters.shape[1])
+
+# one bundle per wordle length, each only built when that length is first played
+def bundle_path(length, cache_dir=BUNDLE_CACHE_DIR):
+    return os.path.join(cache_dir, f'wordles-{length}.bundle')
+
+def load_bundle(path, checksum, length):
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+        return None
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, bundle_length, _, bundle_checksum = _HEADER.unpack_from(buffer)
+    if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or length != bundle_length or bundle_checksum != checksum:
+        buffer.close()
+        return None
+    return Bundle(buffer)
+
+def sources_checksum(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHECKSUM_BLOCK_BYTES), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.digest()
+
+def write_bundle(path, checksum, index: WordleIndex):
+    letters = wordles_to_array(index.wordles, index.length)
+    sections = [
+        letters,
+        np.array(index.scores, dtype=np.int64),
+        np.array([index.wordle_to_usage.get(wordle, -1) for wordle in index.wordles], dtype=np.int64),
+    ]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, index.length, len(index.wordles), checksum))
+        for section in sections:
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(section.tobytes())
+    os.replace(tmp_path, path)
+
+def _align(offset):
+    return (offset + 7) & ~7
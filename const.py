@@ -1,2 +1,5 @@
 
-WORDLE_LENGTH = 5
\ No newline at end of file
+DEFAULT_WORDLE_LENGTH = 5
+MIN_WORDLE_LENGTH = 4
+MAX_WORDLE_LENGTH = 11
+ALPHABET_SIZE = 26
\ No newline at end of file
@@ -1,2 +1,2 @@
 # http://wordlist.aspell.net/scowl-readme/
-./mk-list english 80 | grep -E '^[a-zA-Z]{5}\s$' | awk '{print tolower($0)}' | sort | uniq | > data/wordles.csv
\ No newline at end of file
+./mk-list english 80 | grep -E '^[a-zA-Z]{4,11}\s$' | awk '{print tolower($0)}' | sort | uniq | > data/wordles.csv
\ No newline at end of file
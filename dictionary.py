@@ -0,0 +1,161 @@
+import csv
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple
+
+import metrics
+from book import OpeningBook, fetch_opening_book
+from bundle import bundle_path, load_bundle, sources_checksum, write_bundle
+from const import DEFAULT_WORDLE_LENGTH, MAX_WORDLE_LENGTH, MIN_WORDLE_LENGTH
+from frequency import wordles_to_frequencies
+from index import WordleIndex
+from lookahead import Lookahead
+from patterns import Patterns, fetch_patterns
+
+MINIMUM_USAGE = 100_000
+# usage files are read this much at a time, however large they are
+USAGE_BLOCK_BYTES = 4 << 20
+# files past this size are split over every core unless told otherwise
+USAGE_SPLIT_BYTES = 64 << 20
+WORDLE_TO_USAGE_PATH = 'data/wordle-frequencies.csv'
+WORDLES_PATH = 'data/wordles.csv'
+
+# everything games of one wordle length share
+class Dictionary(NamedTuple):
+    index: WordleIndex
+    patterns: Patterns
+    book: OpeningBook
+    lookahead: Lookahead
+
+# every wordle length a process plays, each loaded on first use and kept; loading one length
+# never waits on another, and threads asking for the same one wait for a single load
+class Dictionaries:
+    def __init__(self, books=True, usage_path=WORDLE_TO_USAGE_PATH):
+        self.books = books
+        self.usage_path = usage_path
+        self._dictionaries: Dict[int, Dictionary] = {}
+        self._lock = threading.Lock()
+        self._locks: Dict[int, threading.Lock] = {}
+
+    # raises ValueError for lengths outside the supported range or missing from the csvs
+    def get(self, length=DEFAULT_WORDLE_LENGTH) -> Dictionary:
+        dictionary = self._dictionaries.get(length)
+        if dictionary is not None:
+            return dictionary
+        check_length(length)
+        with self._lock:
+            lock = self._locks.setdefault(length, threading.Lock())
+        with lock:
+            dictionary = self._dictionaries.get(length)
+            if dictionary is None:
+                index, patterns = fetch_index_and_patterns(length, self.usage_path)
+                with metrics.timer('load.book'):
+                    book = fetch_opening_book(index, patterns) if self.books else None
+                dictionary = self._dictionaries[length] = Dictionary(index, patterns, book, Lookahead(index, patterns))
+                metrics.count('load.lengths')
+            return dictionary
+
+# the usage threshold is applied when loading so the bundle keeps every count
+@metrics.timed('load.build_bundle')
+def build_bundle(length, checksum, usage_path=WORDLE_TO_USAGE_PATH, workers=None):
+    wordles = fetch_wordles_from_csv(WORDLES_PATH, length)
+    if not wordles:
+        raise ValueError(f"no {length} letter wordles in {WORDLES_PATH}")
+    frequencies = wordles_to_frequencies(sorted(wordles), length)
+    wordle_to_usage = fetch_wordle_to_usage(usage_path, length, 0, workers)
+    path = bundle_path(length)
+    write_bundle(path, checksum, WordleIndex(wordles, frequencies, wordle_to_usage, length=length))
+    return load_bundle(path, checksum, length)
+
+def check_length(length):
+    if not MIN_WORDLE_LENGTH <= length <= MAX_WORDLE_LENGTH:
+        raise ValueError(f"wordle length must be from {MIN_WORDLE_LENGTH} to {MAX_WORDLE_LENGTH}")
+
+def fetch_index_and_patterns(length=DEFAULT_WORDLE_LENGTH, usage_path=WORDLE_TO_USAGE_PATH):
+    with metrics.timer('load.index'):
+        checksum = sources_checksum([WORDLES_PATH, usage_path])
+        bundle = load_bundle(bundle_path(length), checksum, length) or build_bundle(length, checksum, usage_path)
+        index = bundle.to_index(MINIMUM_USAGE)
+    with metrics.timer('load.patterns'):
+        patterns = fetch_patterns(index.wordles)
+    return index, patterns
+
+def fetch_wordles_from_csv(path, length):
+    wordle_re = _wordle_re(length)
+    with open(path, encoding='utf-8') as f:
+        return set(line[0].lower() for line in csv.reader(f) if wordle_re.match(line[0]))
+
+# usage counts of every wordle of the given length with at least min_count, from either our
+# `word,count` csv or a raw gwordlist table (`rank<tab>word<tab>count<tab>...`, as in
+# frequency-alpha-gcide.txt); counts may have thousands separators and later rows of the same
+# word win
+#
+# the file is read in blocks of USAGE_BLOCK_BYTES and each block is searched by one regex that
+# only matches rows of the right length, so every other row is skipped without a python step
+# and memory stays at a block plus the counts kept; with several workers every one scans its
+# own byte range of the file (cut at line starts) and the counts are merged in file order; the
+# workers come from the forkserver where there is one, since lengths are loaded from server
+# executor threads and forking from those can deadlock the child
+@metrics.timed('load.usage')
+def fetch_wordle_to_usage(path, length, min_count=0, workers=None):
+    size = os.path.getsize(path)
+    metrics.count('load.usage_bytes', size)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if size > USAGE_SPLIT_BYTES else 1
+    bounds = _line_starts(path, [size * i // workers for i in range(workers)]) + [size]
+    ranges = [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+    if len(ranges) <= 1:
+        return _scan_usage(path, length, min_count, 0, size)
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+    result = {}
+    with ProcessPoolExecutor(len(ranges), mp_context=context) as executor:
+        for usage in executor.map(_scan_usage, *zip(*[(path, length, min_count, start, end) for start, end in ranges])):
+            result.update(usage)
+    return result
+
+# the offset of the first line starting at or after each offset
+def _line_starts(path, offsets):
+    starts = []
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            if offset == 0:
+                starts.append(0)
+                continue
+            f.seek(offset - 1)
+            f.readline()
+            starts.append(f.tell())
+    return starts
+
+def _scan_usage(path, length, min_count, start, end):
+    usage_re = _usage_re(length)
+    result = {}
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        rest = b''
+        while remaining > 0:
+            block = f.read(min(USAGE_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            block = rest + block
+            cut = block.rfind(b'\n') + 1 if remaining > 0 else len(block)
+            block, rest = block[:cut], block[cut:]
+            for word, count in usage_re.findall(block):
+                count = int(count.translate(None, b',"'))
+                if count >= min_count:
+                    result[word.decode('ascii').lower()] = count
+    return result
+
+# a row of either format whose word has exactly length letters: an optional rank, the word,
+# then its count after a comma or whitespace, quoted or not
+def _usage_re(length):
+    return re.compile(rb'^[ \t]*(?:[0-9]+[ \t]+)?([A-Za-z]{%d})[ \t]*[,\t ][ \t]*("?[0-9][0-9,]*)' % length, re.MULTILINE)
+
+def _wordle_re(length):
+    return re.compile(f"^[a-z]{{{length}}}$")
@@ -0,0 +1,39 @@
+import numpy as np
+
+from const import ALPHABET_SIZE
+from patterns import wordles_to_array
+
+# counts over a (count, length) array of letter codes (a = 0), all dense and indexed by letter code
+class FrequencyModel:
+    def __init__(self, letters):
+        self.positional = np.zeros((letters.shape[1], ALPHABET_SIZE), dtype=np.int64)
+        for i in range(letters.shape[1]):
+            self.positional[i] = np.bincount(letters[:, i], minlength=ALPHABET_SIZE)
+        self.letters = self.positional.sum(axis=0)
+        self.bigrams = _ngram_counts(letters, 2)
+        self.trigrams = _ngram_counts(letters, 3)
+        # the old substring table only counted single letters starting before the last position,
+        # and the frequency score has always been ranked by those counts
+        self.letter_scores = self.positional[:-1].sum(axis=0)
+        for array in [self.positional, self.letters, self.bigrams, self.trigrams, self.letter_scores]:
+            array.setflags(write=False)
+
+    def score(self, wordle):
+        return sum(int(self.letter_scores[ord(c) - ord('a')]) for c in set(wordle))
+
+    def scores(self, letters):
+        present = np.zeros((len(letters), ALPHABET_SIZE), dtype=bool)
+        present[np.arange(len(letters))[:, None], letters] = True
+        return present.astype(np.int64) @ self.letter_scores
+
+def wordles_to_frequencies(wordles, length=None):
+    return FrequencyModel(wordles_to_array(wordles, length))
+
+def _ngram_counts(letters, n):
+    counts = np.zeros(ALPHABET_SIZE ** n, dtype=np.int64)
+    for start in range(letters.shape[1] - n + 1):
+        codes = np.zeros(len(letters), dtype=np.int64)
+        for i in range(start, start + n):
+            codes = codes * ALPHABET_SIZE + letters[:, i]
+        counts += np.bincount(codes, minlength=ALPHABET_SIZE ** n)
+    return counts.reshape((ALPHABET_SIZE,) * n)
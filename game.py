@@ -1,25 +1,50 @@
-import copy
-import re
-import sys
-from typing import Dict, Set
+from enum import Enum
+from typing import Dict, List, Optional, Set, Tuple
 
-from const import WORDLE_LENGTH
-from util import max_by
+import numpy as np
 
+import metrics
+from frequency import FrequencyModel
+from index import WordleIndex, unpack_letter
+from patterns import GREEN, YELLOW, Patterns, result_to_pattern, wordles_to_pattern_matrix
+from strategy import pattern_bucket_sizes, pattern_entropies, pattern_expected_remaining
+
+# probing the whole dictionary costs a bincount over every guess and candidate, which stays
+# under 100 ms up to about this many candidates; past it the frequency pick is used
+MAXIMUM_PROBE_CANDIDATES = 1000
+
+class Constraint(Enum):
+    CONFIRM = 0
+    ELIMINATE = 1
+    SOMEWHERE = 2
+
+# everything a game reads through the index is shared and read-only; a game only owns its
+# constraints and the candidate bitset it has narrowed to
 class Game:
-    def __init__(self, wordles, substr_to_freq, wordle_to_usage=None, debug=False):
-        self._candidates = copy.copy(wordles)
+    def __init__(self, index, patterns=None, book=None, probes=False, lookahead=None, debug=False):
+        self._candidates_bits = index.all
         self._candidates_dirty = False
+        self._pending: List[Tuple[Constraint, str, int]] = []
         
-        self.confirmed = [None for _ in range(WORDLE_LENGTH)]
+        self.book = book
+        self.confirmed = [None for _ in range(index.length)]
         self.debug = debug
         self.eliminated: Set[str] = set()
+        self.frequencies: FrequencyModel = index.frequencies
+        self.index: WordleIndex = index
+        self.lookahead = lookahead
+        # the (guess rank, pattern) of every turn played, or None once the game took a guess,
+        # result or constraint that precomputed strategies (book, tree) cannot follow
+        self.path: Optional[Tuple[Tuple[int, int], ...]] = ()
+        self.patterns: Patterns = patterns
+        self.probes = probes
+        # ranks the word list refused as guesses, never recommended again this game
+        self.rejected: Set[int] = set()
         self.somewhere_else: Dict[int, Set[str]] = {}
-        self.substr_to_freq: Dict[str, int] = substr_to_freq
-        self.wordle_to_usage: Dict[str, int] = wordle_to_usage or {}
+        self.wordle_to_usage: Dict[str, int] = index.wordle_to_usage
 
     def apply_caps(self, guess, result):
-        for i in range(WORDLE_LENGTH):
+        for i in range(self.index.length):
             g = guess[i].lower()
             r = result[i]
             if r >= 'A' and r <= 'Z':
@@ -30,42 +55,102 @@ class Game:
                 self.eliminate(g)
         return self.best_candidate()
 
+    # results are read before anything is applied, so a refused one (False) or a contradicting
+    # green (ValueError) leaves the game as it was
     def apply_colors(self, guess, result) -> bool:
-        for i in range(WORDLE_LENGTH):
-            g = guess[i].lower()
-            r = result[i]
-            if r.lower() == 'g':
-                self.confirm(g, i)
-            elif r.lower() == 'y':
-                self.somewhere(g, i)
-            elif r.lower() == 'b' or r == '_' or r == ' ':
-                self.eliminate(g)
-            else:
-                return False
+        guess = guess.lower()
+        pattern = result_to_pattern(result[:self.index.length])
+        if pattern is None or len(guess) != self.index.length or not (guess.isascii() and guess.isalpha()):
+            return False
+        self._apply(guess, self.index.wordle_to_i.get(guess), pattern)
         return True
 
+    def apply_pattern(self, guess_i, pattern):
+        packed = int(self.index.packed[guess_i])
+        self._apply(''.join(unpack_letter(packed, i) for i in range(self.index.length)), guess_i, pattern)
+
+    # wordles are identified by their index rank from here on; only the repl decodes them into strings
     def best_candidate(self):
-        if len(self.candidates) == 0:
+        bits = self.candidates_bits
+        if bits == 0:
             return None
         else:
-            return max_by(self.candidates, self._score)
+            return (bits & -bits).bit_length() - 1
+
+    # the opening book's guess for this mode, or None once the game has left it
+    def book_guess(self, mode):
+        if self.book is None or self.path is None or self.probes:
+            return None
+        return self.book.lookup(mode, self.path)
+
+    def best_candidate_by_entropy(self):
+        if self.patterns is None:
+            raise ValueError('entropy requires a pattern matrix')
+        candidates = self.candidate_indices
+        if len(candidates) == 0:
+            return None
+        entropies = pattern_entropies(self.patterns, candidates, candidates)
+        return int(candidates[entropies.argmax()])
+
+    def best_candidate_by_lookahead(self, cancelled=None):
+        if self.lookahead is None:
+            raise ValueError('lookahead requires a searcher')
+        return self.lookahead.best_guess(self.candidates_bits, cancelled)
+
+    # the candidate whose largest bucket is smallest, then smallest on average, then best scored
+    def best_candidate_by_minimax(self):
+        if self.patterns is None:
+            raise ValueError('minimax requires a pattern matrix')
+        candidates = self.candidate_indices
+        if len(candidates) == 0:
+            return None
+        worst, expected = pattern_bucket_sizes(self.patterns, candidates, candidates)
+        return int(candidates[np.lexsort((expected, worst))[0]])
+
+    def best_candidate_to_finish(self):
+        candidates = self.index.decode_array(self.candidates_bits, self.index.finish_order)
+        return None if len(candidates) == 0 else int(candidates[0])
+
+    def best_candidates(self, k, finish=False):
+        return self.index.top(self.candidates_bits, k, finish)
 
-    def best_candidates(self):
-        pairs = [(wordle, self._score(wordle)) for wordle in self.candidates]
-        pairs.sort(key=lambda pair: -pair[1])
-        return pairs
+    def worst_candidates(self, k, finish=False):
+        return self.index.bottom(self.candidates_bits, k, finish)
 
-    def best_candidates_to_finish(self):
-        pairs = [(wordle, self.wordle_to_usage.get(wordle, -sys.maxsize + self._score(wordle))) for wordle in self.candidates]
-        pairs.sort(key=lambda pair: -pair[1])
-        return pairs
+    # any dictionary wordle not rejected, candidate or not, that leaves the fewest candidates on
+    # average; candidates win ties and then the better scored wordle does
+    def best_probe(self):
+        candidates = self.candidate_indices
+        if self.patterns is None or len(candidates) <= 2 or len(candidates) > MAXIMUM_PROBE_CANDIDATES:
+            return self.best_candidate()
+        guesses = np.arange(len(self.index))
+        if self.rejected:
+            guesses = np.setdiff1d(guesses, list(self.rejected))
+        expected = pattern_expected_remaining(self.patterns, guesses, candidates)
+        flags = self.index.decode_flags(self.candidates_bits)[guesses]
+        return int(guesses[np.lexsort((guesses, ~flags, expected))[0]])
+
+    # (worst case, expected) candidates left after guessing the given rank
+    def bucket_sizes(self, guess):
+        if self.patterns is None:
+            raise ValueError('bucket sizes require a pattern matrix')
+        worst, expected = pattern_bucket_sizes(self.patterns, [guess], self.candidate_indices)
+        return int(worst[0]), float(expected[0])
+
+    @property
+    def candidate_count(self):
+        return self.candidates_bits.bit_count()
+
+    @property
+    def candidate_indices(self):
+        return self.index.decode_array(self.candidates_bits)
 
     @property
-    def candidates(self):
+    def candidates_bits(self):
         if self._candidates_dirty:
             self._validate_candidates()
             self._candidates_dirty = False
-        return self._candidates
+        return self._candidates_bits
 
     def confirm(self, letter, i):
         l = letter.lower()
@@ -73,56 +158,121 @@ class Game:
             raise ValueError(f"already confirmed index {i} as {self.confirmed[i]}")
         else:
             self.confirmed[i] = l
+        self.path = None
+        self._pending.append((Constraint.CONFIRM, l, i))
         self._candidates_dirty = True
 
+    # an independent game in the same state, for trying out results without touching this one
+    def copy(self):
+        game = Game(self.index, patterns=self.patterns, book=self.book, probes=self.probes, lookahead=self.lookahead, debug=self.debug)
+        game._candidates_bits = self.candidates_bits
+        game.confirmed = list(self.confirmed)
+        game.eliminated = set(self.eliminated)
+        game.path = self.path
+        game.rejected = set(self.rejected)
+        game.somewhere_else = {i: set(letters) for i, letters in self.somewhere_else.items()}
+        return game
+
     def eliminate(self, letter):
-        self.eliminated.add(letter.lower())
+        l = letter.lower()
+        self.eliminated.add(l)
+        self.path = None
+        self._pending.append((Constraint.ELIMINATE, l, None))
         self._candidates_dirty = True
 
     def remove_candidate(self, wordle):
-        self._candidates.remove(wordle)
+        bit = self.index.bit(wordle)
+        if not self._candidates_bits & bit:
+            raise ValueError(f"{wordle} is not a candidate")
+        self.path = None
+        self._candidates_bits &= ~bit
         self._candidates_dirty = True
 
+    # the word list refused wordle as a guess, whether it was a candidate or a probe; raises
+    # ValueError for wordles outside the dictionary
+    def reject(self, wordle):
+        guess_i = self.index.wordle_to_i.get(wordle)
+        if guess_i is None:
+            raise ValueError(f"{wordle} is not in the dictionary")
+        self.rejected.add(guess_i)
+        self.path = None
+        if self._candidates_bits & (1 << guess_i):
+            self.remove_candidate(wordle)
+
     def somewhere(self, letter, i):
-        self.somewhere_else.setdefault(i, set()).add(letter.lower())
+        l = letter.lower()
+        self.somewhere_else.setdefault(i, set()).add(l)
+        self.path = None
+        self._pending.append((Constraint.SOMEWHERE, l, i))
         self._candidates_dirty = True
 
-    def _score(self, wordle):
-        return sum(self.substr_to_freq[c] for c in set(wordle))
+    # with patterns the candidates narrow to exactly the answers that give this pattern: when the
+    # guess repeats a letter the extra copy shows gray, which as a letter constraint would rule
+    # out answers holding the letter once. the letters are still recorded for finishing and display
+    def _apply(self, guess, guess_i, pattern):
+        codes = [pattern // 3 ** i % 3 for i in range(self.index.length)]
+        for i, (letter, code) in enumerate(zip(guess, codes)):
+            if code == GREEN and self.confirmed[i] not in (None, letter):
+                raise ValueError(f"already confirmed index {i} as {self.confirmed[i]}")
 
+        path = self.path
+        if self.patterns is None:
+            for i, (letter, code) in enumerate(zip(guess, codes)):
+                if code == GREEN:
+                    self.confirm(letter, i)
+                elif code == YELLOW:
+                    self.somewhere(letter, i)
+                else:
+                    self.eliminate(letter)
+        else:
+            with metrics.timer('game.narrow'):
+                bits = self.candidates_bits
+                candidates = self.index.decode_array(bits)
+                row = self.patterns.matrix[guess_i] if guess_i is not None else wordles_to_pattern_matrix([guess], self.index.wordles)[0]
+                self._candidates_bits = self.index.encode(candidates[row[candidates] == pattern])
+            if self.debug:
+                print(f"{guess} eliminated", (bits & ~self._candidates_bits).bit_count(), 'of', bits.bit_count(), 'wordles')
+            for i, (letter, code) in enumerate(zip(guess, codes)):
+                if code == GREEN:
+                    self.confirmed[i] = letter
+                elif code == YELLOW:
+                    self.somewhere_else.setdefault(i, set()).add(letter)
+                else:
+                    self.eliminated.add(letter)
+        self._follow_path(path, guess_i, pattern)
+
+    # guesses outside the dictionary leave the path for good
+    def _follow_path(self, path, guess_i, pattern):
+        if path is None or guess_i is None:
+            self.path = None
+        else:
+            self.path = path + ((guess_i, pattern),)
+
+    # only constraints added since the last validation are applied; older ones already narrowed the bits
+    @metrics.timed('game.validate')
     def _validate_candidates(self):
-        candidate_regex = ''
-        somewheres = set()
-        for i in range(WORDLE_LENGTH):
-            if self.confirmed[i] is not None:
-                candidate_regex += self.confirmed[i]
+        metrics.count('game.constraints', len(self._pending))
+        bits = self._candidates_bits
+        for constraint, letter, i in self._pending:
+            new_bits = bits
+            if constraint == Constraint.CONFIRM:
+                new_bits &= self.index.with_letter_at(letter, i)
+            elif constraint == Constraint.ELIMINATE:
+                for j in range(self.index.length):
+                    if self.confirmed[j] is None:
+                        new_bits &= ~self.index.with_letter_at(letter, j)
             else:
-                excluded = set(self.eliminated)
-                # for c in self.confirmed:
-                #     if c is not None:
-                #         excluded.add(c)
-                for j, letters in self.somewhere_else.items():
-                    if i == j:
-                        for letter in letters:
-                            somewheres.add(letter)
-                            excluded.add(letter)
-                candidate_regex += f"[^{''.join(excluded)}]" if len(excluded) > 0 else '.'
-
-        if self.debug:
-            print('candidate regex is', candidate_regex)
-        candidate_re = re.compile(candidate_regex)
-        self._candidates = [wordle for wordle in self._candidates if candidate_re.match(wordle)]
-
-        somewheres_count = len(somewheres)
-        if somewheres_count > 0:
-            new_candidates = []
-            for wordle in self._candidates:
-                if sum(1 if l in wordle else 0 for l in somewheres) == somewheres_count:
-                    new_candidates.append(wordle)
+                # the letter is in the word even once its position is confirmed as another one,
+                # which a batch of constraints (a signature or tree replay) confirms first
+                new_bits &= self.index.with_letter(letter)
+                if self.confirmed[i] is None:
+                    new_bits &= ~self.index.with_letter_at(letter, i)
+
             if self.debug:
-                removed = len(self._candidates) - len(new_candidates)
-                if removed == 0:
-                    print('no wordles eliminated due to yellows')
-                else:
-                    print(removed, 'of', len(self._candidates), 'wordles eliminated due to yellows')
-            self._candidates = new_candidates
+                removed = (bits & ~new_bits).bit_count()
+                position = '' if i is None else f" at {i}"
+                print(f"{constraint.name.lower()} {letter}{position} eliminated", removed, 'of', bits.bit_count(), 'wordles')
+            bits = new_bits
+
+        self._pending.clear()
+        self._candidates_bits = bits
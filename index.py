@@ -0,0 +1,163 @@
+import hashlib
+import heapq
+import sys
+from itertools import islice
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Tuple
+
+import numpy as np
+
+import metrics
+from const import ALPHABET_SIZE, DEFAULT_WORDLE_LENGTH
+from frequency import FrequencyModel
+from patterns import wordles_to_array
+
+LETTER_BITS = 5
+LETTER_MASK = (1 << LETTER_BITS) - 1
+
+# the bitset of the given ranks, which needs no index to build
+def indices_to_bits(indices):
+    indices = np.asarray(indices, dtype=np.intp)
+    if len(indices) == 0:
+        return 0
+    flags = np.zeros(int(indices.max()) + 1, dtype=bool)
+    flags[indices] = True
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+def pack_wordle(wordle):
+    return sum((ord(c) - ord('a')) << (LETTER_BITS * i) for i, c in enumerate(wordle))
+
+def unpack_letter(packed, i):
+    return chr(ord('a') + ((packed >> (LETTER_BITS * i)) & LETTER_MASK))
+
+# wordles are ranked best score first and identified by that rank everywhere, so bit i of
+# every bitset below stands for the i-th best wordle and the lowest set bit of any candidate
+# bitset is its best candidate; pass scores to skip ranking when wordles are already in order
+#
+# each wordle is also packed into a uint64 of LETTER_BITS per letter (first letter lowest)
+# alongside a 26 bit mask of the letters it contains; every wordle has the same length, which
+# only has to be given for an index of no wordles
+#
+# one index is shared by every game in the process, so it is read-only once built; a game
+# starts from the shared `all` bitset and only ever owns the smaller bitsets it narrows to
+class WordleIndex:
+    def __init__(self, wordles, frequencies, wordle_to_usage=None, scores=None, length=None):
+        self.frequencies: FrequencyModel = frequencies
+        self.wordle_to_usage: Mapping[str, int] = MappingProxyType(dict(wordle_to_usage or {}))
+
+        if scores is None:
+            wordles = list(wordles)
+            ranked = sorted(zip((-frequencies.scores(wordles_to_array(wordles))).tolist(), wordles))
+            wordles = [wordle for _, wordle in ranked]
+            scores = [-negated for negated, _ in ranked]
+        self.wordles: Tuple[str, ...] = tuple(wordles)
+        self.length = len(self.wordles[0]) if self.wordles else (length or DEFAULT_WORDLE_LENGTH)
+        self.wordle_to_i: Mapping[str, int] = MappingProxyType({wordle: i for i, wordle in enumerate(self.wordles)})
+        self.scores = np.array(scores, dtype=np.int64)
+        self.finish_scores = np.array(
+            [self.wordle_to_usage.get(wordle, -sys.maxsize + score) for wordle, score in zip(wordles, scores)], dtype=np.int64
+        )
+        self.finish_order = np.argsort(-self.finish_scores, kind='stable')
+        self.finish_positions = np.empty(len(self.wordles), dtype=np.int64)
+        self.finish_positions[self.finish_order] = np.arange(len(self.wordles))
+        self.all = (1 << len(self.wordles)) - 1
+
+        letters = wordles_to_array(self.wordles, self.length)
+        shifts = np.arange(self.length, dtype=np.uint64) * np.uint64(LETTER_BITS)
+        self.packed = np.bitwise_or.reduce(letters.astype(np.uint64) << shifts, axis=1) if len(letters) else np.zeros(0, dtype=np.uint64)
+        self.masks = np.bitwise_or.reduce(np.uint32(1) << letters.astype(np.uint32), axis=1) if len(letters) else np.zeros(0, dtype=np.uint32)
+
+        at: List[Mapping[str, int]] = []
+        for i in range(self.length):
+            codes = (self.packed >> np.uint64(LETTER_BITS * i)) & np.uint64(LETTER_MASK)
+            at.append(MappingProxyType({chr(ord('a') + code): self.encode_flags(codes == code) for code in np.unique(codes)}))
+        self.at: Tuple[Mapping[str, int], ...] = tuple(at)
+        self.containing: Mapping[str, int] = MappingProxyType({
+            chr(ord('a') + code): self.encode_flags(self.masks & np.uint32(1 << code) != 0)
+            for code in range(ALPHABET_SIZE)
+        })
+
+        for array in [self.scores, self.finish_scores, self.finish_order, self.finish_positions, self.packed, self.masks]:
+            array.setflags(write=False)
+
+    def __len__(self):
+        return len(self.wordles)
+
+    # mapping proxies do not pickle, so worker processes rebuild the index from its inputs
+    def __reduce__(self):
+        return (WordleIndex, (self.wordles, self.frequencies, dict(self.wordle_to_usage), self.scores.tolist(), self.length))
+
+    # the worst k of bits, worst last, by score or by finish score
+    @metrics.timed('rank.bottom')
+    def bottom(self, bits, k, finish=False) -> List[int]:
+        if finish:
+            return self.finish_order[_select(self.finish_positions[self.decode_array(bits)], -k)].tolist()
+        worst = []
+        while bits and len(worst) < k:
+            i = bits.bit_length() - 1
+            worst.append(i)
+            bits ^= 1 << i
+        return worst[::-1]
+
+    def bit(self, wordle):
+        i = self.wordle_to_i.get(wordle)
+        return 0 if i is None else 1 << i
+
+    # identifies the wordles, their order and their finish scores, which is everything a
+    # precomputed strategy depends on besides its own code
+    def digest(self):
+        digest = hashlib.sha256('\n'.join(self.wordles).encode('utf-8'))
+        digest.update(self.finish_scores.tobytes())
+        return digest.digest()
+
+    # ranks of bits best first, produced as they are asked for; by score that walks set bits
+    # from the lowest, by finish score it heapifies the finish positions once and pops lazily
+    def ranked(self, bits, finish=False) -> Iterator[int]:
+        if finish:
+            heap = self.finish_positions[self.decode_array(bits)].tolist()
+            heapq.heapify(heap)
+            while heap:
+                yield int(self.finish_order[heapq.heappop(heap)])
+        else:
+            while bits:
+                low = bits & -bits
+                yield low.bit_length() - 1
+                bits ^= low
+
+    def decode_array(self, bits, order=None):
+        flags = self.decode_flags(bits)
+        return np.flatnonzero(flags) if order is None else order[flags[order]]
+
+    def decode_flags(self, bits):
+        flags = np.frombuffer(bits.to_bytes((len(self.wordles) + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(flags, count=len(self.wordles), bitorder='little').view(bool)
+
+    def encode(self, indices):
+        return indices_to_bits(indices)
+
+    def encode_flags(self, flags):
+        return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+    # the best k of bits by score or by finish score; rank order is score order, so by score this
+    # is the lowest k set bits and never decodes the rest, by finish score a partial selection
+    @metrics.timed('rank.top')
+    def top(self, bits, k, finish=False) -> List[int]:
+        if finish:
+            return self.finish_order[_select(self.finish_positions[self.decode_array(bits)], k)].tolist()
+        return list(islice(self.ranked(bits), k))
+
+    def with_letter(self, letter):
+        return self.containing.get(letter, 0)
+
+    def with_letter_at(self, letter, i):
+        return self.at[i].get(letter, 0)
+
+# the smallest k positions in order (or the largest -k, still ascending) without sorting the rest
+def _select(positions, k):
+    n = abs(k)
+    if n == 0:
+        return positions[:0]
+    if n < len(positions):
+        positions = np.partition(positions, n - 1 if k > 0 else len(positions) - n)
+        positions = positions[:n] if k > 0 else positions[-n:]
+    return np.sort(positions)
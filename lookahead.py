@@ -0,0 +1,178 @@
+import itertools
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict
+
+import numpy as np
+
+from index import WordleIndex, indices_to_bits
+from patterns import Patterns
+from strategy import pattern_buckets, pattern_expected_remaining
+
+# how often a search waiting on the pool checks whether it was cancelled
+CANCEL_POLL_SECONDS = 0.005
+# search ids cancelled lately, shared with the workers; a search's slot is its id modulo this
+CANCELLED_SLOTS = 1024
+LOOKAHEAD_BUDGET_SECONDS = 2.0
+LOOKAHEAD_WIDTH = 16
+# one lookahead serves every game of a length, so the best guesses it remembers are bounded too
+MAX_BEST_SIZE = 10_000
+MAX_MEMO_SIZE = 200_000
+
+# set once per worker process; the memo outlives single searches so buckets shared between
+# guesses, turns and games are only ever solved once per worker
+_worker_cancelled = None
+_worker_memo: Dict[int, float] = {}
+_worker_patterns: Patterns = None
+
+# two-ply search: the LOOKAHEAD_WIDTH candidates that leave the fewest candidates on average
+# are each scored by the candidates expected to be left after the best second guess in every
+# bucket they split the candidates into; the lowest score wins and earlier (one-ply better)
+# guesses win ties
+#
+# a guess's score is summed biggest bucket first and abandoned as soon as it passes the best
+# complete score so far, which is handed to each guess as it is started on a worker; searches
+# stop at the time budget with the best guess found so far (the one-ply pick if none finished),
+# and only searches that finished are remembered by their candidate bitset
+#
+# a search can be cancelled too (a speculative one the player has moved past), by handing it a
+# check that is polled beside the deadline; workers see it through the id of their search in
+# shared memory. a later search landing on the same slot only overwrites a cancellation, so at
+# worst a long cancelled search runs on to its deadline
+#
+# the worker pool is started by the forkserver where there is one, since the first search can
+# come from any thread (a server executor or the repl's speculation) and forking a process
+# while other threads hold locks can deadlock the child
+class Lookahead:
+    def __init__(self, index: WordleIndex, patterns: Patterns, workers=None, width=LOOKAHEAD_WIDTH, budget=LOOKAHEAD_BUDGET_SECONDS):
+        self.budget = budget
+        self.index = index
+        self.patterns = patterns
+        self.width = width
+        self.workers = workers or os.cpu_count() or 1
+        self._best: Dict[int, int] = {}
+        self._cancelled = None
+        self._executor: ProcessPoolExecutor = None
+        self._lock = threading.Lock()
+        self._memo: Dict[int, float] = {}
+        self._search_ids = itertools.count(1)
+
+    def __reduce__(self):
+        return (Lookahead, (self.index, self.patterns, self.workers, self.width, self.budget))
+
+    # cancelled, if given, is called to ask whether the caller no longer wants the answer
+    def best_guess(self, candidates_bits, cancelled=None):
+        with self._lock:
+            best = self._best.get(candidates_bits)
+        if best is not None:
+            return best
+        candidates = self.index.decode_array(candidates_bits)
+        if len(candidates) == 0:
+            return None
+        expected = pattern_expected_remaining(self.patterns, candidates, candidates)
+        first_ply = candidates[np.lexsort((candidates, expected))[:self.width]].tolist()
+        if len(candidates) <= 2:
+            return first_ply[0]
+
+        deadline = time.monotonic() + self.budget
+        if self.workers == 1:
+            best, complete = self._search(first_ply, candidates, deadline, cancelled)
+        else:
+            best, complete = self._search_in_pool(first_ply, candidates, deadline, cancelled)
+        if best is None:
+            return first_ply[0]
+        if complete:
+            with self._lock:
+                if len(self._best) >= MAX_BEST_SIZE:
+                    self._best.clear()
+                self._best[candidates_bits] = best
+        return best
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else None)
+                self._cancelled = context.Array('q', CANCELLED_SLOTS, lock=False)
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker, initargs=(self.patterns, self._cancelled))
+            return self._executor
+
+    def _search(self, first_ply, candidates, deadline, cancelled):
+        best_score, best = math.inf, None
+        for guess in first_ply:
+            score = evaluate(self.patterns, self._memo, guess, candidates, best_score, deadline, cancelled)
+            if score is None:
+                return best, False
+            if score < best_score:
+                best_score, best = score, guess
+        return best, True
+
+    # keeps one guess per worker in flight so each starts with the tightest bound known
+    def _search_in_pool(self, first_ply, candidates, deadline, cancelled):
+        executor = self._pool()
+        with self._lock:
+            search_id = next(self._search_ids)
+        best_score, best_position = math.inf, None
+        pending = {}
+        next_position = 0
+        complete = True
+        while next_position < len(first_ply) or pending:
+            while next_position < len(first_ply) and len(pending) < self.workers:
+                future = executor.submit(_evaluate_in_worker, first_ply[next_position], candidates, best_score, deadline, search_id)
+                pending[future] = next_position
+                next_position += 1
+            timeout = max(deadline - time.monotonic(), 0)
+            done, _ = wait(pending, timeout=timeout if cancelled is None else min(timeout, CANCEL_POLL_SECONDS), return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled():
+                self._cancelled[search_id % CANCELLED_SLOTS] = search_id
+                complete = False
+                break
+            if not done and time.monotonic() >= deadline:
+                complete = False
+                break
+            for future in done:
+                position = pending.pop(future)
+                score = future.result()
+                if score is None:
+                    complete = False
+                elif (score, position) < (best_score, best_position if best_position is not None else math.inf):
+                    best_score, best_position = score, position
+            if not complete:
+                break
+        for future in pending:
+            future.cancel()
+        return (None if best_position is None else first_ply[best_position]), complete
+
+# candidates expected to be left after guess and then the best second guess in each bucket;
+# inf once it passes bound (ties survive, so earlier guesses can still win them) and None
+# past the deadline or once cancelled
+def evaluate(patterns: Patterns, memo, guess, candidates, bound, deadline, cancelled=None):
+    score = 0.0
+    for members in pattern_buckets(patterns, guess, candidates):
+        if len(members) == 1:
+            break # the rest are singletons too, which the second guess always solves
+        if time.monotonic() > deadline or (cancelled is not None and cancelled()):
+            return None
+        key = indices_to_bits(members)
+        best = memo.get(key)
+        if best is None:
+            best = float(pattern_expected_remaining(patterns, members, members).min())
+            if len(memo) >= MAX_MEMO_SIZE:
+                memo.clear()
+            memo[key] = best
+        score += len(members) * best / len(candidates)
+        if score > bound:
+            return math.inf
+    return score
+
+def _evaluate_in_worker(guess, candidates, bound, deadline, search_id):
+    return evaluate(_worker_patterns, _worker_memo, guess, candidates, bound, deadline, lambda: _worker_cancelled[search_id % CANCELLED_SLOTS] == search_id)
+
+def _init_worker(patterns, cancelled):
+    global _worker_cancelled, _worker_patterns
+    _worker_cancelled = cancelled
+    _worker_patterns = patterns
@@ -1,45 +1,121 @@
 
-# TODO: deal with duplicate letters, confirmed vs in word
 # TODO: detect final guess and re-incorperate google word frequency for most likely
 
-import csv
-import re
+import argparse
+import asyncio
 
-from const import WORDLE_LENGTH
+import metrics
+from book import build_opening_book, opening_book_path, write_opening_book
+from bundle import bundle_path, sources_checksum
+from const import DEFAULT_WORDLE_LENGTH, MAX_WORDLE_LENGTH, MIN_WORDLE_LENGTH
+from dictionary import WORDLE_TO_USAGE_PATH, WORDLES_PATH, Dictionaries, build_bundle, fetch_index_and_patterns
 from game import Game
-from pygtrie import StringTrie
-from repl import Repl
-
-WORDLE_RE = re.compile(f"^[a-z]{{{WORDLE_LENGTH}}}$")
-WORDLE_TO_USAGE_PATH = 'data/wordle-frequencies.csv'
-WORDLES_PATH = 'data/wordles.csv'
-
-def fetch_wordles_from_csv(path):
-    with open(path, encoding='utf-8') as f:
-        return set(line[0].lower() for line in csv.reader(f) if WORDLE_RE.match(line[0]))
-
-def fetch_wordle_to_usage_from_csv_with_minimum_count(path, min_count):
-    with open(path, encoding='utf-8') as f:
-        result = {}
-        for line in csv.reader(f):
-            word = line[0].strip().lower()
-            if WORDLE_RE.match(word):
-                count = int(line[1].strip().replace(',', ''))
-                if count >= min_count:
-                    result[word] = count
-        return result
-
-def wordles_to_substr_frequencies(wordles):
-    trie = StringTrie()
-    for wordle in wordles:
-        for start_i in range(WORDLE_LENGTH - 1):
-            for end_i in range(start_i + 1, WORDLE_LENGTH + 1):
-                key = wordle[start_i:end_i]
-                trie[key] = trie.setdefault(key, 0) + 1
-    return {k: v for k, v in trie.iteritems()}
+from multi import MultiGame
+from optimal import optimal_tree_path, solve_optimal, write_optimal_tree
+from repl import DEFAULT_MODE, ELIMINATE_MODES, GuessMode, MultiRepl, Repl
+from server import DEFAULT_HOST, DEFAULT_PORT, SolverService
+from simulate import print_report, simulate, write_report
+from tree import TREE_MODES, build_tree, fetch_tree, load_tree, tree_path, write_tree
+
+# a length the csvs have no wordles of ends the command the way the repl answers it
+def load_or_exit(load, *args):
+    try:
+        return load(*args)
+    except ValueError as e:
+        print('error:', e)
+        exit(1)
 
 if __name__ == '__main__':
-    wordles = fetch_wordles_from_csv(WORDLES_PATH)
-    substr_to_freq = wordles_to_substr_frequencies(wordles)
-    wordle_to_usage = fetch_wordle_to_usage_from_csv_with_minimum_count(WORDLE_TO_USAGE_PATH, 100_000)
-    Repl(lambda: Game(wordles, substr_to_freq, wordle_to_usage=wordle_to_usage)).repl()
+    parser = argparse.ArgumentParser(description='a shitty wordle solver/repl')
+    parser.add_argument('--boards', type=int, default=1, help='play N boards at once in the repl (4 for quordle, 8 for octordle)')
+    parser.add_argument('--length', type=int, choices=range(MIN_WORDLE_LENGTH, MAX_WORDLE_LENGTH + 1), default=DEFAULT_WORDLE_LENGTH, metavar='N', help=f"letters per wordle, {MIN_WORDLE_LENGTH} to {MAX_WORDLE_LENGTH} (the server takes it per request)")
+    parser.add_argument('--usage', default=WORDLE_TO_USAGE_PATH, metavar='PATH', help='word usage counts, as a word,count csv or a raw gwordlist frequency table')
+    parser.add_argument('--stats', action='store_true', help='record counters and latencies from startup (`stats` in the repl, GET /stats when serving)')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('book', help='rebuild the opening book of first and second guesses for every mode')
+    bundle_parser = subparsers.add_parser('bundle', help='recompile the csvs into the binary bundle loaded at startup')
+    bundle_parser.add_argument('--workers', type=int, help='worker processes to split the usage file over (defaults to every core for very large files)')
+    tree_parser = subparsers.add_parser('tree', help='rebuild the decision tree a mode plays against every answer')
+    tree_parser.add_argument('--mode', choices=[mode.name.lower() for mode in TREE_MODES], default=DEFAULT_MODE.name.lower())
+    optimal_parser = subparsers.add_parser('optimal', help='solve the strategy with the fewest expected guesses (takes hours; resumes when rerun)')
+    optimal_parser.add_argument('--limit', type=int, help='only solve for the first N wordles')
+    optimal_parser.add_argument('--output', default='optimal.json', help='where to write the json report and strategy')
+    optimal_parser.add_argument('--workers', type=int, help='worker processes to spread first guesses over (defaults to every core)')
+    optimal_parser.add_argument('--restart', action='store_true', help='discard the checkpoint of an earlier run')
+    simulate_parser = subparsers.add_parser('simulate', help='play every wordle as the hidden answer and report how the solver did')
+    simulate_parser.add_argument('--mode', choices=[mode.name.lower() for mode in ELIMINATE_MODES], default=DEFAULT_MODE.name.lower())
+    simulate_parser.add_argument('--limit', type=int, help='only play the first N wordles')
+    simulate_parser.add_argument('--output', default='simulation.json', help='where to write the json report')
+    simulate_parser.add_argument('--workers', type=int, help='worker processes to spread games over (defaults to every core)')
+    simulate_parser.add_argument('--probes', action='store_true', help='let eliminate mode guess non-candidates that split the candidates better')
+    simulate_parser.add_argument('--no-book', action='store_true', help='search live on the first two turns instead of using the opening book')
+    serve_parser = subparsers.add_parser('serve', help='serve the solver as json over http')
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--workers', type=int, help='threads to run filtering and scoring on')
+    args = parser.parse_args()
+    metrics.enable(args.stats)
+
+    if args.command == 'bundle':
+        load_or_exit(build_bundle, args.length, sources_checksum([WORDLES_PATH, args.usage]), args.usage, args.workers)
+        print('wrote', bundle_path(args.length))
+        exit()
+
+    if args.command == 'book':
+        index, patterns = load_or_exit(fetch_index_and_patterns, args.length, args.usage)
+        path = opening_book_path(index)
+        write_opening_book(path, index, build_opening_book(index, patterns))
+        print('wrote', path)
+        exit()
+
+    if args.command == 'optimal':
+        index, patterns = load_or_exit(fetch_index_and_patterns, args.length, args.usage)
+        report = solve_optimal(index, patterns, limit=args.limit, workers=args.workers, restart=args.restart)
+        print('optimal', f"{report['optimal_mean_guesses']:.4f}", 'guesses on average against', f"{report['heuristic_mean_guesses']:.4f}", 'for eliminate mode')
+        write_report(report, args.output)
+        # a strategy for only some of the answers cannot play a real game, so only the report has it
+        if report['answers'] < len(index):
+            print('wrote', args.output)
+            exit()
+        path = optimal_tree_path(index.length)
+        write_optimal_tree(path, index, report['strategy'])
+        print('wrote', args.output, 'and', path)
+        exit()
+
+    # the server loads whatever lengths its requests ask for; everything else plays one
+    # length at a time, the repl switching on `length N`
+    dictionaries = Dictionaries(usage_path=args.usage)
+    if args.command == 'serve':
+        try:
+            asyncio.run(SolverService(dictionaries, workers=args.workers, length=args.length).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        exit()
+
+    index, patterns, book, _ = load_or_exit(dictionaries.get, args.length)
+    if args.command == 'tree':
+        mode = GuessMode[args.mode.upper()]
+        path = tree_path(mode, index.length)
+        write_tree(path, index, mode, build_tree(index, patterns, mode, book))
+        print('wrote', path)
+    elif args.command == 'simulate':
+        book = None if args.no_book else book
+        report = simulate(index, patterns, GuessMode[args.mode.upper()], limit=args.limit, workers=args.workers, book=book, probes=args.probes)
+        print_report(report)
+        write_report(report, args.output)
+        print('wrote', args.output)
+    elif args.boards > 1:
+        def multi_game_factory(length):
+            dictionary = dictionaries.get(length)
+            return MultiGame(dictionary.index, dictionary.patterns, args.boards)
+        MultiRepl(multi_game_factory, args.length).repl()
+    else:
+        def game_factory(length):
+            dictionary = dictionaries.get(length)
+            return Game(dictionary.index, patterns=dictionary.patterns, book=dictionary.book, lookahead=dictionary.lookahead)
+        def tree_factory(mode, length):
+            index, patterns, book, _ = dictionaries.get(length)
+            if mode is None:
+                return load_tree(optimal_tree_path(length), index)
+            return fetch_tree(index, patterns, mode, book)
+        Repl(game_factory, tree_factory, args.length).repl()
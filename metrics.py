@@ -0,0 +1,150 @@
+import functools
+import json
+import threading
+import time
+from typing import Dict
+
+# latencies are kept in power of two buckets of microseconds, bucket b holding those under
+# 2**b us (and at least half that), so this many reach past half an hour
+HISTOGRAM_BUCKETS = 32
+PERCENTILES = [50, 90, 99]
+
+# counters and latency histograms by name, off until enabled; while off every timer, timed
+# call and count is one check of a module flag, so instrumented code costs nothing measurable
+#
+# names are dotted by the phase they measure (game.validate, rank.top, load.bundle,
+# repl.result, ...); each process keeps its own, so worker pools are not counted
+_counters: Dict[str, int] = {}
+_enabled = False
+_histograms: Dict[str, 'Histogram'] = {}
+_lock = threading.Lock()
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.max = 0.0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.buckets[min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.max = max(self.max, seconds)
+        self.total += seconds
+
+    # the upper bound of the bucket holding the pth percentile, never past the slowest seen
+    def percentile_ms(self, p):
+        rank = p / 100 * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(2 ** b / 1000, self.max * 1000)
+        return self.max * 1000
+
+    def to_json(self):
+        summary = {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0.0,
+            'max_ms': self.max * 1000,
+        }
+        summary.update({f"p{p}_ms": self.percentile_ms(p) for p in PERCENTILES})
+        summary['buckets_us'] = {str(2 ** b): n for b, n in enumerate(self.buckets) if n}
+        return summary
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        observe(self.name, time.perf_counter() - self.start)
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+_NO_TIMER = _NoTimer()
+
+def count(name, n=1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+def enable(enabled=True):
+    global _enabled
+    _enabled = enabled
+
+def enabled():
+    return _enabled
+
+def observe(name, seconds):
+    if _enabled:
+        with _lock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = _histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+def print_stats():
+    stats = snapshot()
+    if not stats['counters'] and not stats['timers']:
+        print('nothing recorded' + ('' if stats['enabled'] else '; stats are off (`stats on` or --stats)'))
+        return
+    width = max(map(len, list(stats['counters']) + list(stats['timers'])))
+    for name, value in stats['counters'].items():
+        print('', name.ljust(width), value)
+    for name, timer in stats['timers'].items():
+        percentiles = ' '.join(f"p{p} {timer[f'p{p}_ms']:.3f}" for p in PERCENTILES)
+        print('', name.ljust(width), f"n {timer['count']} total {timer['total_ms']:.1f} mean {timer['mean_ms']:.3f} {percentiles} max {timer['max_ms']:.3f} ms")
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+# everything recorded so far, as plain json types
+def snapshot():
+    with _lock:
+        return {
+            'enabled': _enabled,
+            'counters': dict(sorted(_counters.items())),
+            'timers': {name: histogram.to_json() for name, histogram in sorted(_histograms.items())},
+        }
+
+def to_json(indent=None):
+    return json.dumps(snapshot(), indent=indent)
+
+# times the block under name when enabled
+def timer(name):
+    return _Timer(name) if _enabled else _NO_TIMER
+
+# times every call of the decorated function under name when enabled
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def write_stats(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(to_json(indent=2))
@@ -0,0 +1,101 @@
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+
+import metrics
+from index import WordleIndex
+from patterns import Patterns, result_to_pattern, wordles_to_pattern_matrix
+from strategy import combined_expected_remaining
+
+DEFAULT_BOARDS = 4
+# only the best scored candidates of each board are tried as the shared guess, which keeps a
+# turn to a few hundred guesses scored against every board however many candidates are left
+MULTI_GUESS_WIDTH = 64
+
+# several boards (quordle, octordle) played with the same guesses against different answers;
+# each board is a candidate bitset over the shared index, narrowed to the candidates that give
+# exactly its result for the guess as a game with patterns is, so repeated letters never cost a
+# board its answer
+class MultiGame:
+    def __init__(self, index: WordleIndex, patterns: Patterns, boards=DEFAULT_BOARDS):
+        if boards < 1:
+            raise ValueError('at least one board is required')
+        self.candidates_bits = [index.all for _ in range(boards)]
+        self.index = index
+        self.patterns = patterns
+        self.solved = [False for _ in range(boards)]
+        self.turns = 0
+
+    def __len__(self):
+        return len(self.candidates_bits)
+
+    # results are given for every board or for the unsolved ones only, in board order, and an
+    # all green result solves its board; nothing is applied unless the guess and every result
+    # are readable
+    def apply_colors(self, guess, results: List[str]) -> bool:
+        guess = guess.lower()
+        unsolved = self.unsolved
+        if len(results) == len(self):
+            results = [results[board] for board in unsolved]
+        elif len(results) != len(unsolved):
+            return False
+        board_patterns = [result_to_pattern(result) if len(result) == self.index.length else None for result in results]
+        if None in board_patterns or len(guess) != self.index.length or not (guess.isascii() and guess.isalpha()):
+            return False
+
+        guess_i = self.index.wordle_to_i.get(guess)
+        row = self.patterns.matrix[guess_i] if guess_i is not None else wordles_to_pattern_matrix([guess], self.index.wordles)[0]
+        for board, pattern in zip(unsolved, board_patterns):
+            if pattern == self.patterns.solved:
+                self.solved[board] = True
+            else:
+                candidates = self.index.decode_array(self.candidates_bits[board])
+                self.candidates_bits[board] = self.index.encode(candidates[row[candidates] == pattern])
+        self.turns += 1
+        return True
+
+    # a board down to one candidate is solved outright first (the best scored such one);
+    # otherwise the guess leaving the fewest candidates expected over every unsolved board,
+    # then the one that is a candidate on the most boards, then the best scored
+    @metrics.timed('rank.multi')
+    def best_guess(self) -> Optional[int]:
+        bits, weights = self._unsolved_candidates()
+        if len(bits) == 0 or 0 in bits:
+            return None
+        certain = [b for b in bits if b.bit_count() == 1]
+        if certain:
+            return min((b & -b).bit_length() - 1 for b in certain)
+        guesses = np.unique(np.concatenate([np.array(self.index.top(b, MULTI_GUESS_WIDTH), dtype=np.intp) for b in bits]))
+        expected = self._expected_remaining(guesses, bits, weights)
+        boards = sum(weight * self.index.decode_flags(b)[guesses].astype(np.int64) for b, weight in zip(bits, weights))
+        return int(guesses[np.lexsort((guesses, -boards, expected))[0]])
+
+    def best_candidates(self, board, k):
+        return self.index.top(self.candidates_bits[board], k)
+
+    # candidates left on each board, None for solved ones
+    @property
+    def candidate_counts(self) -> List[Optional[int]]:
+        return [None if solved else bits.bit_count() for bits, solved in zip(self.candidates_bits, self.solved)]
+
+    @property
+    def done(self):
+        return all(self.solved)
+
+    # summed over the unsolved boards
+    def expected_remaining(self, guess):
+        bits, weights = self._unsolved_candidates()
+        return float(self._expected_remaining(np.array([guess]), bits, weights)[0])
+
+    @property
+    def unsolved(self) -> List[int]:
+        return [board for board, solved in enumerate(self.solved) if not solved]
+
+    def _expected_remaining(self, guesses, bits, weights):
+        return combined_expected_remaining(self.patterns, guesses, [self.index.decode_array(b) for b in bits], weights)
+
+    # boards left with the same candidates (every board on the first turn) are scored once
+    def _unsolved_candidates(self):
+        counts = Counter(self.candidates_bits[board] for board in self.unsolved)
+        return list(counts.keys()), list(counts.values())
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from game import Game
+from index import WordleIndex, indices_to_bits
+from patterns import PATTERNS_CACHE_DIR, Patterns
+from repl import ELIMINATE_MODES, GuessMode, finish_reason, recommend
+from strategy import pattern_buckets, pattern_expected_remaining, pattern_split_sizes
+from tree import OPTIMAL_MODE, write_tree
+
+MAX_TABLE_SIZE = 2_000_000
+OPTIMAL_CHECKPOINT_VERSION = 1
+
+# set once per worker process; the table outlives single first guesses so subtrees shared
+# between them are only solved once per worker
+_worker_solver: 'OptimalSolver' = None
+
+# exact search for the strategy that minimizes the total number of guesses over a set of
+# answers (and so the expected number for a uniformly random one), always guessing one of the
+# remaining candidates, which is the same rule every live mode follows
+#
+# total(S) = |S| + sum of total(bucket) over the buckets a guess splits S into besides the
+# solved one, minimized over guesses; a bucket of m answers takes at least 2m - 1 more guesses
+# (one on its first guess, every other on its second), so with at most k buckets a set takes at
+# least 3|S| - 2 - k, which is the lower bound that prunes guesses whose partial total already
+# reaches the best one found
+#
+# the transposition table maps a candidate bitset to (total, exact, guess), where a total that
+# is not exact is only known to be at least that much
+class OptimalSolver:
+    def __init__(self, patterns: Patterns):
+        self.patterns = patterns
+        self.table: Dict[int, Tuple[int, bool, Optional[int]]] = {}
+
+    def lower_bound(self, members):
+        entry = self.table.get(indices_to_bits(members))
+        return max(_size_bound(len(members), self.patterns.count), 0 if entry is None else entry[0])
+
+    # the best total below bound, or a lower bound on it that is at least bound
+    def solve(self, members, bound=math.inf):
+        n = len(members)
+        if n <= 2:
+            return 2 * n - 1
+        key = indices_to_bits(members)
+        entry = self.table.get(key)
+        if entry is not None and (entry[1] or entry[0] >= bound):
+            return entry[0]
+        n_buckets, squares = pattern_split_sizes(self.patterns, members, members)
+        lower = max(3 * n - 2 - int(n_buckets.max()), 0 if entry is None else entry[0])
+        if lower >= bound:
+            return lower
+
+        best, best_guess = bound, None
+        for guess in members[np.lexsort((members, squares))].tolist():
+            total = self.solve_guess(members, guess, best)
+            if total < best:
+                best, best_guess = total, guess
+                if best == lower:
+                    break
+
+        if len(self.table) >= MAX_TABLE_SIZE:
+            self.table.clear()
+        if best_guess is None:
+            self.table[key] = (max(lower, int(bound)), False, None)
+            return max(lower, int(bound))
+        self.table[key] = (best, True, best_guess)
+        return best
+
+    # the total of guessing guess first, or a lower bound on it once it reaches bound
+    def solve_guess(self, members, guess, bound=math.inf):
+        buckets = pattern_buckets(self.patterns, guess, members)
+        total = len(members) + sum(self.lower_bound(bucket) for bucket in buckets)
+        for bucket in buckets:
+            if total >= bound:
+                return total
+            lower = self.lower_bound(bucket)
+            total += self.solve(bucket, bound - (total - lower)) - lower
+        return total
+
+    # the nested strategy the table holds for members, solving anything it has lost
+    def strategy(self, members, guess=None):
+        if guess is None:
+            if len(members) <= 2:
+                guess = int(members[0])
+            else:
+                self.solve(members)
+                guess = self.table[indices_to_bits(members)][2]
+        children = {}
+        for bucket in pattern_buckets(self.patterns, guess, members):
+            children[int(self.patterns.matrix[guess, bucket[0]])] = self.strategy(bucket)
+        return {'guess': guess, 'children': children}
+
+# the total eliminate mode plays to over the same answers, switching to finish as a game does;
+# its games start on members alone, so a limited run is compared against the same answers
+def heuristic_total(index: WordleIndex, patterns: Patterns, members):
+    game = Game(index, patterns=patterns)
+    for i in np.setdiff1d(np.arange(len(index)), members).tolist():
+        game.remove_candidate(index.wordles[i])
+    return _mode_total(game, GuessMode.ELIMINATE)
+
+def checkpoint_path(index: WordleIndex, limit, cache_dir=PATTERNS_CACHE_DIR):
+    digest = hashlib.sha256(f"{OPTIMAL_CHECKPOINT_VERSION}\n{limit}\n".encode('utf-8') + index.digest())
+    return os.path.join(cache_dir, f'optimal-{digest.hexdigest()[:16]}.jsonl')
+
+# the first guesses are spread over a process pool, one per worker in flight so each starts
+# with the best total known; every finished first guess is appended to the checkpoint, and a
+# rerun with the same dictionary and limit resumes from it
+def solve_optimal(index: WordleIndex, patterns: Patterns, limit=None, workers=None, restart=False):
+    members = np.arange(len(index) if limit is None else min(limit, len(index)))
+    path = checkpoint_path(index, limit)
+    if restart and os.path.exists(path):
+        os.remove(path)
+
+    results = _read_checkpoint(path)
+    best_total, best_strategy = math.inf, None
+    for total, exact, strategy in results.values():
+        if exact and total < best_total:
+            best_total, best_strategy = total, strategy
+
+    expected = pattern_expected_remaining(patterns, members, members)
+    first_guesses = [guess for guess in members[np.lexsort((members, expected))].tolist() if index.wordles[guess] not in results]
+    workers = min(workers or os.cpu_count() or 1, len(first_guesses) or 1)
+    start = time.perf_counter()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    n_done = len(results)
+    with open(path, 'a', encoding='utf-8') as checkpoint:
+        def record(guess, total, exact, strategy):
+            nonlocal best_total, best_strategy, n_done
+            line = {'guess': index.wordles[guess], 'total': total, 'exact': exact, 'strategy': strategy and _strategy_to_json(index, strategy)}
+            checkpoint.write(json.dumps(line, separators=(',', ':')) + '\n')
+            checkpoint.flush()
+            if exact and total < best_total:
+                best_total, best_strategy = total, line['strategy']
+            n_done += 1
+            print(f"\rsolved {n_done}/{len(members)} first guesses, best {best_total / len(members):.4f} guesses", end='', file=sys.stderr, flush=True)
+
+        if workers == 1:
+            _init_worker(patterns)
+            for guess in first_guesses:
+                record(guess, *_solve_first_guess(members, guess, best_total))
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+            with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(patterns,)) as executor:
+                pending = {}
+                queue = deque(first_guesses)
+                while queue or pending:
+                    while queue and len(pending) < workers:
+                        guess = queue.popleft()
+                        pending[executor.submit(_solve_first_guess, members, guess, best_total)] = guess
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(pending.pop(future), *future.result())
+    print(file=sys.stderr)
+
+    heuristic = heuristic_total(index, patterns, members)
+    return {
+        'answers': len(members),
+        'optimal_total': best_total,
+        'optimal_mean_guesses': best_total / len(members),
+        'heuristic_total': heuristic,
+        'heuristic_mean_guesses': heuristic / len(members),
+        'elapsed_seconds': time.perf_counter() - start,
+        'workers': workers,
+        'strategy': best_strategy,
+    }
+
+# the strategy as decision tree sections the repl can play from
+def strategy_to_tree(index: WordleIndex, strategy):
+    guesses, counts, edge_starts, edge_patterns, edge_children = [], [], [0], [], []
+    queue = deque([strategy])
+    while queue:
+        node = queue.popleft()
+        guesses.append(index.wordle_to_i[node['guess']])
+        counts.append(_strategy_size(node))
+        for pattern, child in sorted((int(pattern), child) for pattern, child in node['children'].items()):
+            edge_patterns.append(pattern)
+            edge_children.append(len(guesses) + len(queue))
+            queue.append(child)
+        edge_starts.append(len(edge_patterns))
+    return [
+        np.array(guesses, dtype=np.int32),
+        np.full(len(guesses), OPTIMAL_MODE, dtype=np.uint8),
+        np.array(counts, dtype=np.uint32),
+        np.array(edge_starts, dtype=np.uint32),
+        np.array(edge_patterns, dtype=np.uint32),
+        np.array(edge_children, dtype=np.int32),
+    ]
+
+def optimal_tree_path(length, cache_dir=PATTERNS_CACHE_DIR):
+    return os.path.join(cache_dir, f'tree-optimal-{length}.bin')
+
+def write_optimal_tree(path, index: WordleIndex, strategy):
+    write_tree(path, index, OPTIMAL_MODE, strategy_to_tree(index, strategy))
+
+# the bound for any set of n answers, no guess having more unsolved buckets than all but one pattern
+def _size_bound(n, pattern_count):
+    return max(2 * n - 1, 3 * n - 2 - (pattern_count - 1))
+
+def _init_worker(patterns):
+    global _worker_solver
+    _worker_solver = OptimalSolver(patterns)
+
+# every guess a mode makes against each of the game's candidates, summed; its guesses are
+# always candidates, so each turn narrows the game
+def _mode_total(game: Game, mode: GuessMode):
+    if mode in ELIMINATE_MODES and finish_reason(game) is not None:
+        mode = GuessMode.FINISH
+    guess = recommend(game, mode)
+    total = game.candidate_count
+    for pattern in np.unique(game.patterns.matrix[guess, game.candidate_indices]).tolist():
+        if pattern != game.patterns.solved:
+            child = game.copy()
+            child.apply_pattern(guess, pattern)
+            total += _mode_total(child, mode)
+    return total
+
+def _read_checkpoint(path):
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # a line cut short by an interruption
+            results[entry['guess']] = (entry['total'], entry['exact'], entry['strategy'])
+    return results
+
+# (total, exact, strategy) of one first guess, the strategy only when it beats bound
+def _solve_first_guess(members, guess, bound):
+    total = _worker_solver.solve_guess(members, guess, bound)
+    if total >= bound:
+        return total, False, None
+    return total, True, _worker_solver.strategy(members, guess)
+
+def _strategy_size(node):
+    return 1 + sum(_strategy_size(child) for child in node['children'].values())
+
+def _strategy_to_json(index: WordleIndex, node):
+    return {
+        'guess': index.wordles[node['guess']],
+        'children': {str(pattern): _strategy_to_json(index, child) for pattern, child in node['children'].items()},
+    }
@@ -0,0 +1,130 @@
+import hashlib
+import os
+
+import numpy as np
+
+BLACK = 0
+YELLOW = 1
+GREEN = 2
+PATTERNS_CACHE_DIR = 'data/cache'
+
+_CHUNK_SIZE = 256
+_RESULT_TO_CODE = {'g': GREEN, 'y': YELLOW, 'b': BLACK, '_': BLACK, ' ': BLACK}
+
+# a pattern is the base 3 number of a result, first letter lowest, so wordles of length n
+# have 3 ** n patterns and the all green one is the last
+def pattern_count(length):
+    return 3 ** length
+
+# the narrowest unsigned type that holds every pattern (uint8 for five letters and fewer)
+def pattern_dtype(length):
+    return np.min_scalar_type(pattern_count(length) - 1)
+
+def solved_pattern(length):
+    return pattern_count(length) - 1
+
+# every wordle of a matrix has the same length, which sets its pattern count and solved pattern
+class Patterns:
+    def __init__(self, wordles, matrix, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.length = len(wordles[0]) if len(wordles) else 0
+        self.count = pattern_count(self.length)
+        self.solved = solved_pattern(self.length)
+        self.wordles = wordles
+        self.matrix = matrix
+        self._wordle_to_i = {wordle: i for i, wordle in enumerate(wordles)}
+
+    # cached matrices travel to other processes as their cache location rather than 41 MB of bytes
+    def __reduce__(self):
+        if self.cache_dir is None:
+            return (Patterns, (self.wordles, np.asarray(self.matrix)))
+        return (fetch_patterns, (self.wordles, self.cache_dir))
+
+    def pattern(self, guess, answer):
+        guess_i = self._wordle_to_i.get(guess)
+        answer_i = self._wordle_to_i.get(answer)
+        if guess_i is None or answer_i is None:
+            return feedback(guess, answer)
+        return int(self.matrix[guess_i, answer_i])
+
+def dictionary_hash(wordles):
+    return hashlib.sha256('\n'.join(wordles).encode('utf-8')).hexdigest()[:16]
+
+# the pure python version of a single pattern; the matrix below must agree with this
+def feedback(guess, answer):
+    codes = [BLACK] * len(guess)
+    unmatched = {}
+    for i in range(len(guess)):
+        if guess[i] == answer[i]:
+            codes[i] = GREEN
+        else:
+            unmatched[answer[i]] = unmatched.get(answer[i], 0) + 1
+    for i in range(len(guess)):
+        if codes[i] != GREEN and unmatched.get(guess[i], 0) > 0:
+            codes[i] = YELLOW
+            unmatched[guess[i]] -= 1
+    return sum(code * 3 ** i for i, code in enumerate(codes))
+
+def fetch_patterns(wordles, cache_dir=PATTERNS_CACHE_DIR):
+    path = os.path.join(cache_dir, f'patterns-{dictionary_hash(wordles)}.npy')
+    if not os.path.exists(path):
+        matrix = wordles_to_pattern_matrix(wordles)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+    return Patterns(wordles, np.load(path, mmap_mode='r'), cache_dir)
+
+def pattern_to_result(pattern, length):
+    result = ''
+    for _ in range(length):
+        result += '_yg'[pattern % 3]
+        pattern //= 3
+    return result
+
+def result_to_pattern(result):
+    pattern = 0
+    for i in range(len(result)):
+        code = _RESULT_TO_CODE.get(result[i].lower())
+        if code is None:
+            return None
+        pattern += code * 3 ** i
+    return pattern
+
+# the length only has to be given when there may be no wordles to take it from
+def wordles_to_array(wordles, length=None):
+    text = ''.join(wordles)
+    if length is None:
+        length = len(wordles[0]) if len(wordles) else 1
+    flat = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return (flat - ord('a')).reshape(-1, length)
+
+def wordles_to_pattern_matrix(guesses, answers=None):
+    guesses = wordles_to_array(guesses)
+    answers = guesses if answers is None else wordles_to_array(answers, guesses.shape[1])
+    matrix = np.empty((len(guesses), len(answers)), dtype=pattern_dtype(guesses.shape[1]))
+    for start in range(0, len(guesses), _CHUNK_SIZE):
+        chunk = guesses[start:start + _CHUNK_SIZE]
+        matrix[start:start + len(chunk)] = _chunk_to_patterns(chunk, answers)
+    return matrix
+
+# a non-green guess letter is yellow while the answer still has unmatched copies of it
+# that earlier non-green copies in the guess have not already claimed
+def _chunk_to_patterns(guesses, answers):
+    length = guesses.shape[1]
+    dtype = pattern_dtype(length)
+    g = guesses[:, None, :]
+    a = answers[None, :, :]
+    greens = g == a
+    patterns = np.zeros(greens.shape[:2], dtype=dtype)
+    for i in range(length):
+        unmatched = np.zeros(patterns.shape, dtype=np.uint8)
+        for j in range(length):
+            unmatched += (g[:, :, i] == a[:, :, j]) & ~greens[:, :, j]
+        claimed = np.zeros(patterns.shape, dtype=np.uint8)
+        for k in range(i):
+            claimed += (guesses[:, k] == guesses[:, i])[:, None] & ~greens[:, :, k]
+        yellows = ~greens[:, :, i] & (unmatched > claimed)
+        patterns += (GREEN * greens[:, :, i] + YELLOW * yellows).astype(dtype) * dtype.type(3 ** i)
+    return patterns
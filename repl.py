@@ -1,9 +1,16 @@
 
+import threading
+import time
 from enum import Enum
-from typing import Callable, Tuple
+from typing import Callable, NamedTuple, Optional, Tuple
 
-from const import WORDLE_LENGTH
+import numpy as np
+
+import metrics
+from const import DEFAULT_WORDLE_LENGTH, MAX_WORDLE_LENGTH, MIN_WORDLE_LENGTH
 from game import Game
+from multi import MultiGame
+from patterns import result_to_pattern
 
 class CommandResult(Enum):
     SUCCESS = 0
@@ -15,32 +22,179 @@ class CommandResult(Enum):
 class GuessMode(Enum):
     ELIMINATE = 0
     FINISH = 1
+    ENTROPY = 2
+    MINIMAX = 3
+    LOOKAHEAD = 4
 
 DEFAULT_MODE = GuessMode.ELIMINATE
+ELIMINATE_MODES = [GuessMode.ELIMINATE, GuessMode.ENTROPY, GuessMode.MINIMAX, GuessMode.LOOKAHEAD]
 MINIMUM_COUNT_TO_FINISH = 25
-MINIMUM_GREENS_TO_FINISH = WORDLE_LENGTH - 2
+MAXIMUM_MISSING_GREENS_TO_FINISH = 2
+PRINT_N_BEST_BOARD_CANDIDATES = 5
 PRINT_N_BEST_CANDIDATES = 8
 PRINT_N_BEST_FINISH_CANDIDATES = 5
 PRINT_N_WORST_CANDIDATES = 2
+SPECULATIVE_PATTERNS = 32
+
+_RECOMMEND_TIMERS = {mode: f"recommend.{mode.name.lower()}" for mode in GuessMode}
+# speculation recommends in the background, which is not latency anyone waits on
+_SPECULATE_TIMERS = {mode: f"speculate.{mode.name.lower()}" for mode in GuessMode}
+
+# what a command is recorded as: its own name unless it only got the help text
+def command_metric(line, result):
+    command = line.split(maxsplit=1)[0].lower() if line and result != CommandResult.HELP else 'help'
+    return f"repl.{command}"
+
+def finish_reason(game: Game):
+    if game.candidate_count <= MINIMUM_COUNT_TO_FINISH:
+        return f"no more than {MINIMUM_COUNT_TO_FINISH} candidates"
+    elif sum(1 if l is not None else 0 for l in game.confirmed) >= game.index.length - MAXIMUM_MISSING_GREENS_TO_FINISH:
+        return f"at least {game.index.length - MAXIMUM_MISSING_GREENS_TO_FINISH} greens"
+    return None
+
+# prints why and returns None for anything but a supported length
+def parse_length(value):
+    if not value.isdigit() or not MIN_WORDLE_LENGTH <= int(value) <= MAX_WORDLE_LENGTH:
+        print('error: wordle length must be from', MIN_WORDLE_LENGTH, 'to', MAX_WORDLE_LENGTH)
+        return None
+    return int(value)
+
+def recommend(game: Game, mode: GuessMode):
+    with metrics.timer(_RECOMMEND_TIMERS[mode]):
+        return _recommend(game, mode)
+
+def _recommend(game: Game, mode: GuessMode, cancelled=None):
+    guess = game.book_guess(mode)
+    if guess is not None:
+        return guess
+    elif mode == GuessMode.ELIMINATE:
+        return game.best_probe() if game.probes else game.best_candidate()
+    elif mode == GuessMode.ENTROPY:
+        return game.best_candidate_by_entropy()
+    elif mode == GuessMode.MINIMAX:
+        return game.best_candidate_by_minimax()
+    elif mode == GuessMode.LOOKAHEAD:
+        return game.best_candidate_by_lookahead(cancelled)
+    else:
+        return game.best_candidate_to_finish()
+
+# stats, stats on | off | reset | json, for either repl
+def repl_command_stats(argument):
+    if argument is None:
+        metrics.print_stats()
+    elif argument in ['on', 'off']:
+        metrics.enable(argument == 'on')
+        print('stats are now', argument)
+    elif argument == 'reset':
+        metrics.reset()
+        print('stats reset')
+    elif argument == 'json':
+        print(metrics.to_json(indent=2))
+    else:
+        return CommandResult.HELP
+    return CommandResult.NOOP
+
+class Speculated(NamedTuple):
+    game: Game
+    mode: GuessMode
+    guess: Optional[int]
+
+# the repl sits in input() while the player types a result, so once a guess is recommended a
+# background thread plays its likeliest patterns (biggest buckets first) on copies of the game;
+# taking a pattern waits for it if it is in progress and cancels any other, whose lookahead
+# search would otherwise hold the pool the live search needs
+class Speculation:
+    def __init__(self, game: Game, guess, mode: GuessMode):
+        self.game = game
+        self.guess = guess
+        self.mode = mode
+        self._base = game.copy()
+        self._cancel = threading.Event()
+        self._condition = threading.Condition()
+        self._current = None
+        self._results = {}
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        with self._condition:
+            self._stopped = True
+            self._cancel.set()
+
+    # only waits when the thread is in the middle of that very pattern
+    def take(self, pattern) -> Optional[Speculated]:
+        with self._condition:
+            self._stopped = True
+            if self._current != pattern:
+                self._cancel.set()
+            while self._current == pattern:
+                self._condition.wait()
+            return self._results.get(pattern)
 
+    def _run(self):
+        counts = np.bincount(self._base.patterns.matrix[self.guess, self._base.candidate_indices], minlength=self._base.patterns.count)
+        counts[self._base.patterns.solved] = 0
+        for pattern in np.argsort(-counts, kind='stable')[:SPECULATIVE_PATTERNS].tolist():
+            with self._condition:
+                if self._stopped or counts[pattern] == 0:
+                    return
+                self._current = pattern
+            result = None
+            try:
+                result = self._speculate(pattern)
+            finally:
+                with self._condition:
+                    # a cancelled search settles for a weaker guess, which is not kept
+                    if not self._cancel.is_set():
+                        self._results[pattern] = result
+                    self._current = None
+                    self._condition.notify_all()
+
+    def _speculate(self, pattern):
+        game = self._base.copy()
+        try:
+            game.apply_pattern(self.guess, pattern)
+        except ValueError:
+            return None
+        if game.candidate_count == 0:
+            return Speculated(game, self.mode, None)
+        mode = self.mode
+        if mode in ELIMINATE_MODES and finish_reason(game) is not None:
+            mode = GuessMode.FINISH
+        with metrics.timer(_SPECULATE_TIMERS[mode]):
+            return Speculated(game, mode, _recommend(game, mode, self._cancel.is_set))
+
+# the factories are given the wordle length to play
 class Repl:
-    def __init__(self, game_factory: Callable[[], Game]):
+    def __init__(self, game_factory: Callable[[int], Game], tree_factory: Optional[Callable[[GuessMode, int], object]] = None, length=DEFAULT_WORDLE_LENGTH):
         self.game_factory = game_factory
+        self.eliminate_mode = DEFAULT_MODE
         self.guess: str = None
+        self.length = length
         self.mode = DEFAULT_MODE
+        self.probes = False
+        self.speculation: Speculation = None
+        self.tree = None
+        self.tree_factory = tree_factory
         self._game: Game = None
+        self._speculated: Speculated = None
 
     @property
     def game(self):
         if self._game is None:
-            self._game = self.game_factory()
+            self._game = self.game_factory(self.length)
+            self._game.probes = self.probes
         return self._game
 
+    # each command is timed from when it was typed until the next prompt
     def repl(self):
         loop = True
         self.update_and_display_recommended_guess()
         while loop:
-            result = self.repl_command()
+            line = input('> ').strip()
+            start = time.perf_counter()
+            result = self.repl_command(line)
             if result == CommandResult.HELP:
                 print("""
 commands:
@@ -50,30 +204,45 @@ commands:
     override the recommended guess with the given wordle
   candidates | wordles
     print out the best candidates
-  mode finish | mode eliminate
+  mode finish | mode eliminate | mode entropy | mode minimax | mode lookahead | mode tree
     manually switch the mode to finish or eliminate (starts as eliminate)
+    entropy eliminates by expected information instead of letter frequency and is kept across resets
+    minimax eliminates by the smallest worst case bucket of wordles left and is kept across resets
+    lookahead searches two guesses deep within a time budget and is kept across resets
+    tree plays the current eliminate mode from its precomputed decision tree (built on first use),
+    searching live again for the rest of a game once a guess is overridden; lookahead has none
+  mode optimal
+    like tree but plays the strategy solved by `python main.py optimal`
   reset | restart
     begin a new game
+  length 6
+    begin a new game of wordles with the given number of letters (4 to 11)
   denied | invalid
     remove best guess as a valid word and try again
   break
     trigger a breakpoint
+  probes
+    toggle probe guesses: eliminate mode may guess any wordle, candidate or not, that
+    splits the remaining candidates best (kept across resets)
   debug
     toggle debug mode
+  stats | stats on | stats off | stats reset | stats json
+    print the counters and latencies recorded so far, switch recording (off unless started
+    with --stats), clear them, or print them as json
   help | ?
     display this help text
   exit
 """.strip())
             elif result == CommandResult.RESET:
                 self._game = None
-                self.set_mode(DEFAULT_MODE)
+                self.set_mode(self.eliminate_mode)
                 print()
                 self.update_and_display_recommended_guess()
             elif result == CommandResult.EXIT:
                 loop = False
+            metrics.observe(command_metric(line, result), time.perf_counter() - start)
 
-    def repl_command(self) -> Tuple[bool, bool]:
-        line = input('> ').strip()
+    def repl_command(self, line) -> Tuple[bool, bool]:
         try:
             index = line.index(' ')
             tokens = [line[0:index], line[index+1:]]
@@ -84,7 +253,11 @@ commands:
         command = tokens[0].lower()
         if command == 'result' and len(tokens) == 2:
             result = tokens[1]
-            result += ' ' * (WORDLE_LENGTH - len(result)) # space pad
+            result += ' ' * (self.game.index.length - len(result)) # space pad
+            self._speculated = self.take_speculation(result)
+            if self._speculated is not None:
+                self._game = self._speculated.game
+                return self.update_and_display_recommended_guess()
             success = self.game.apply_colors(self.guess, result)
             if success:
                 return self.update_and_display_recommended_guess()
@@ -93,82 +266,276 @@ commands:
                 return CommandResult.NOOP
         elif command == 'guess' and len(tokens) == 2:
             wordle = tokens[1].lower()
-            if len(wordle) == WORDLE_LENGTH:
+            if len(wordle) == self.game.index.length:
                 self.guess = wordle
+                self.start_speculation()
                 return CommandResult.SUCCESS
             else:
-                print('error: wordle length must be', WORDLE_LENGTH)
+                print('error: wordle length must be', self.game.index.length)
                 return CommandResult.NOOP
         elif command in ['candidates', 'wordles'] and len(tokens) == 1:
             return self.repl_command_candidates()
+        elif command == 'mode' and len(tokens) == 2 and tokens[1].lower() == 'tree':
+            return self.repl_command_tree(self.eliminate_mode)
+        elif command == 'mode' and len(tokens) == 2 and tokens[1].lower() == 'optimal':
+            return self.repl_command_tree(None)
         elif command == 'mode' and len(tokens) == 2:
             try:
+                self.tree = None
                 self.mode = GuessMode[tokens[1].upper()]
+                if self.mode in ELIMINATE_MODES:
+                    self.eliminate_mode = self.mode
                 return self.update_and_display_recommended_guess()
             except KeyError:
                 pass
         elif command in ['reset', 'restart', 'retry', 'begin']:
             return CommandResult.RESET
+        elif command == 'length' and len(tokens) == 2:
+            return self.repl_command_length(tokens[1])
         elif command in ['denied', 'invalid']:
-            self.game.remove_candidate(self.guess)
+            try:
+                self.game.reject(self.guess)
+            except ValueError as e:
+                print('error:', e)
+                return CommandResult.NOOP
             self.repl_command_candidates()
             return self.update_and_display_recommended_guess()
         elif command == 'break':
             breakpoint()
             return CommandResult.NOOP
+        elif command == 'probes':
+            self.probes = not self.probes
+            self.game.probes = self.probes
+            print('probes are now', 'on' if self.probes else 'off')
+            return self.update_and_display_recommended_guess()
         elif command == 'debug':
             self.game.debug = not self.game.debug
+            self.start_speculation()
             print('debug mode is now', 'on' if self.game.debug else 'off')
             return CommandResult.NOOP
+        elif command == 'stats':
+            return repl_command_stats(tokens[1].lower() if len(tokens) == 2 else None)
         elif command == 'exit':
             return CommandResult.EXIT
         return CommandResult.HELP
 
+    def decode_pairs(self, candidates, finish=False):
+        scores = self.game.index.finish_scores if finish else self.game.index.scores
+        return [(self.game.index.wordles[i], int(scores[i])) for i in candidates]
+
     def repl_command_candidates(self):
-        best_candidates = self.game.best_candidates()
-        best_slice = best_candidates[:PRINT_N_BEST_CANDIDATES]
+        best_slice = self.decode_pairs(self.game.best_candidates(PRINT_N_BEST_CANDIDATES))
         print('best candidates:')
         for pair in best_slice:
             print('', pair[0], pair[1])
-        worst_slice = best_candidates[len(best_candidates) - PRINT_N_WORST_CANDIDATES:]
+        worst_slice = self.decode_pairs(self.game.worst_candidates(PRINT_N_WORST_CANDIDATES))
         if worst_slice != best_slice:
             print('worst candidates:')
             for pair in worst_slice:
                 print('', pair[0], pair[1])
         return CommandResult.SUCCESS
 
+    def repl_command_length(self, value):
+        length = parse_length(value)
+        if length is None:
+            return CommandResult.NOOP
+        try:
+            self.game_factory(length)
+        except ValueError as e:
+            print('error:', e)
+            return CommandResult.NOOP
+        self.length = length
+        self.tree = None
+        return CommandResult.RESET
+
+    # a mode of None is the optimal strategy, which only exists once it has been solved offline
+    def repl_command_tree(self, mode):
+        if self.tree_factory is None:
+            print('error: no decision trees available')
+            return CommandResult.NOOP
+        print('loading the', 'optimal' if mode is None else mode.name.lower(), 'decision tree')
+        try:
+            tree = self.tree_factory(mode, self.length)
+        except ValueError as e:
+            print('error:', e)
+            return CommandResult.NOOP
+        if tree is None:
+            print('error: no optimal strategy for this dictionary; run `python main.py optimal` first')
+            return CommandResult.NOOP
+        self.tree = tree
+        return self.update_and_display_recommended_guess()
+
+    def start_speculation(self):
+        if self.speculation is not None:
+            self.speculation.cancel()
+            self.speculation = None
+        guess = self.game.index.wordle_to_i.get(self.guess)
+        if guess is not None and self.game.patterns is not None and not self.game.debug and self.game.candidate_count > 1:
+            self.speculation = Speculation(self.game, guess, self.mode)
+
+    def take_speculation(self, result):
+        speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        pattern = result_to_pattern(result)
+        if pattern is None or speculation.game is not self._game or speculation.mode != self.mode or self.game.index.wordles[speculation.guess] != self.guess:
+            speculation.cancel()
+            return None
+        return speculation.take(pattern)
+
     def set_mode(self, mode):
         if mode != self.mode:
             self.mode = mode
             print('mode set to', self.mode.name.lower())
 
     def update_and_display_recommended_guess(self):
-        n_candidates = len(self.game.candidates)
+        speculated, self._speculated = self._speculated, None
+        n_candidates = self.game.candidate_count
         if n_candidates == 0:
             print('error: no wordles left; resetting')
             return CommandResult.RESET
 
-        if self.mode == DEFAULT_MODE:
-            if n_candidates <= MINIMUM_COUNT_TO_FINISH:
-                print('mode switched to finish since no more than', MINIMUM_COUNT_TO_FINISH, 'candidates')
-                self.mode = GuessMode.FINISH
-            elif sum(1 if l is not None else 0 for l in self.game.confirmed) >= MINIMUM_GREENS_TO_FINISH:
-                print('mode switched to finish since at least', MINIMUM_GREENS_TO_FINISH, 'greens')
+        if self.mode in ELIMINATE_MODES:
+            reason = finish_reason(self.game)
+            if reason is not None:
+                print('mode switched to finish since', reason)
                 self.mode = GuessMode.FINISH
 
-        if self.mode == GuessMode.ELIMINATE:
-            self.guess = self.game.best_candidate()
+        if self.mode == GuessMode.FINISH and n_candidates > 1:
+            best_slice = self.decode_pairs(self.game.best_candidates(PRINT_N_BEST_FINISH_CANDIDATES, finish=True), finish=True)
+            print('best finish candidates:')
+            for pair in best_slice:
+                print('', pair[0], pair[1])
+        node = None if self.tree is None else self.tree.walk(self.game.path)
+        if node is not None:
+            guess = self.tree.guess(node)
+        elif speculated is not None and speculated.game is self._game and speculated.mode == self.mode and speculated.guess is not None:
+            guess = speculated.guess
         else:
-            best_candidates_to_finish = self.game.best_candidates_to_finish()
-            if n_candidates > 1:
-                best_slice = best_candidates_to_finish[:PRINT_N_BEST_FINISH_CANDIDATES]
-                print('best finish candidates:')
-                for pair in best_slice:
-                    print('', pair[0], pair[1])
-            self.guess = best_candidates_to_finish[0][0]
+            guess = recommend(self.game, self.mode)
+        self.guess = self.game.index.wordles[guess]
+        if node is None:
+            self.start_speculation()
 
         if n_candidates == 1:
             print(self.guess, 'is the only remaining wordle')
+        elif not self.game.candidates_bits & (1 << guess):
+            print(self.guess, 'is the recommended probe to split', n_candidates, 'wordles')
         else:
             print(self.guess, 'is the recommended guess of', n_candidates, 'wordles')
-        return CommandResult.SUCCESS
\ No newline at end of file
+            if self.mode == GuessMode.MINIMAX:
+                worst, expected = self.game.bucket_sizes(guess)
+                print(' leaving at most', worst, 'and', f"{expected:.1f}", 'on average')
+        return CommandResult.SUCCESS
+
+# the repl for several boards at once: one guess per turn and one result per board
+class MultiRepl:
+    def __init__(self, game_factory: Callable[[int], MultiGame], length=DEFAULT_WORDLE_LENGTH):
+        self.game_factory = game_factory
+        self.guess: str = None
+        self.length = length
+        self._game: MultiGame = None
+
+    @property
+    def game(self):
+        if self._game is None:
+            self._game = self.game_factory(self.length)
+        return self._game
+
+    def repl(self):
+        loop = True
+        self.update_and_display_recommended_guess()
+        while loop:
+            line = input('> ').strip()
+            start = time.perf_counter()
+            result = self.repl_command(line)
+            if result == CommandResult.HELP:
+                print("""
+commands:
+  result _g_y_ ggggg y___g ...
+    apply the result of the recommended guess on every board, in board order; results for
+    solved boards may be left out
+  guess wordl
+    override the recommended guess with the given wordle
+  candidates | wordles
+    print out the best candidates of every unsolved board
+  reset | restart
+    begin a new game
+  length 6
+    begin a new game of wordles with the given number of letters (4 to 11)
+  stats | stats on | stats off | stats reset | stats json
+    print the counters and latencies recorded so far, switch recording, clear them, or
+    print them as json
+  help | ?
+    display this help text
+  exit
+""".strip())
+            elif result == CommandResult.RESET:
+                self._game = None
+                print()
+                self.update_and_display_recommended_guess()
+            elif result == CommandResult.EXIT:
+                loop = False
+            metrics.observe(command_metric(line, result), time.perf_counter() - start)
+
+    def repl_command(self, line):
+        tokens = line.split()
+        if len(tokens) == 0:
+            return CommandResult.HELP
+        command = tokens[0].lower()
+        if command == 'result' and len(tokens) > 1:
+            results = [result + ' ' * (self.game.index.length - len(result)) for result in tokens[1:]] # space pad
+            try:
+                success = self.game.apply_colors(self.guess, results)
+            except ValueError as e:
+                print('error:', e)
+                return CommandResult.NOOP
+            if success:
+                return self.update_and_display_recommended_guess()
+            counts = sorted({len(self.game), len(self.game.unsolved)})
+            print('error: expected', ' or '.join(map(str, counts)), 'results of', self.game.index.length, 'g, y or _')
+            return CommandResult.NOOP
+        elif command == 'guess' and len(tokens) == 2:
+            wordle = tokens[1].lower()
+            if len(wordle) == self.game.index.length:
+                self.guess = wordle
+                return CommandResult.SUCCESS
+            print('error: wordle length must be', self.game.index.length)
+            return CommandResult.NOOP
+        elif command in ['candidates', 'wordles'] and len(tokens) == 1:
+            for board in self.game.unsolved:
+                print(f"board {board + 1}:", ' '.join(self.game.index.wordles[i] for i in self.game.best_candidates(board, PRINT_N_BEST_BOARD_CANDIDATES)))
+            return CommandResult.SUCCESS
+        elif command in ['reset', 'restart', 'retry', 'begin']:
+            return CommandResult.RESET
+        elif command == 'length' and len(tokens) == 2:
+            length = parse_length(tokens[1])
+            if length is None:
+                return CommandResult.NOOP
+            try:
+                self.game_factory(length)
+            except ValueError as e:
+                print('error:', e)
+                return CommandResult.NOOP
+            self.length = length
+            return CommandResult.RESET
+        elif command == 'stats' and len(tokens) <= 2:
+            return repl_command_stats(tokens[1].lower() if len(tokens) == 2 else None)
+        elif command == 'exit':
+            return CommandResult.EXIT
+        return CommandResult.HELP
+
+    def update_and_display_recommended_guess(self):
+        if self.game.done:
+            print('solved all', len(self.game), 'boards in', self.game.turns, 'guesses; resetting')
+            return CommandResult.RESET
+        counts = self.game.candidate_counts
+        if 0 in counts:
+            print(f"error: no wordles left on board {counts.index(0) + 1}; resetting")
+            return CommandResult.RESET
+
+        guess = self.game.best_guess()
+        self.guess = self.game.index.wordles[guess]
+        print(self.guess, 'is the recommended guess of', ' / '.join('solved' if count is None else str(count) for count in counts), 'wordles')
+        print(' leaving', f"{self.game.expected_remaining(guess):.1f}", 'across the unsolved boards on average')
+        return CommandResult.SUCCESS
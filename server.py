@@ -0,0 +1,299 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from const import DEFAULT_WORDLE_LENGTH
+from dictionary import Dictionaries
+from game import Game
+from repl import DEFAULT_MODE, ELIMINATE_MODES, GuessMode, finish_reason, recommend
+from solve import DEFAULT_CACHE_SIZE, SolveCache, history_to_signature, signature_to_json
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_TOP_K = 5
+MAX_BODY_BYTES = 64 * 1024
+MAX_SESSIONS = 10_000
+MAX_TOP_K = 100
+SESSION_TTL_SECONDS = 30 * 60
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message):
+        super().__init__(message)
+        self.status = status
+
+# one game plus the repl's mode switching; the lock keeps executor threads from
+# interleaving two requests against the same game
+class Session:
+    def __init__(self, game: Game, mode: GuessMode):
+        self.game = game
+        self.guess: str = None
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.mode = mode
+
+    # the game reads the whole result before applying any of it, so a refused one leaves it as it was
+    def apply_result(self, guess, result):
+        guess = (guess or self.guess or '').lower()
+        length = self.game.index.length
+        if len(guess) != length or not (guess.isascii() and guess.isalpha()):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"guess must be {length} letters")
+        result += ' ' * (length - len(result)) # space pad
+        try:
+            success = self.game.apply_colors(guess, result)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.CONFLICT, str(e))
+        if not success:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'invalid result format')
+        self.update_recommended_guess()
+
+    def recommendation(self, session_id, k):
+        finish = self.mode == GuessMode.FINISH
+        scores = self.game.index.finish_scores if finish else self.game.index.scores
+        return {
+            'session': session_id,
+            'length': self.game.index.length,
+            'mode': self.mode.name.lower(),
+            'guess': self.guess,
+            'count': self.game.candidate_count,
+            'candidates': [
+                {'wordle': self.game.index.wordles[i], 'score': int(scores[i])}
+                for i in self.game.best_candidates(k, finish)
+            ],
+        }
+
+    def update_recommended_guess(self):
+        if self.game.candidate_count == 0:
+            self.guess = None
+            return
+        if self.mode in ELIMINATE_MODES and finish_reason(self.game) is not None:
+            self.mode = GuessMode.FINISH
+        self.guess = self.game.index.wordles[recommend(self.game, self.mode)]
+
+# a small json over http/1.1 front end for many concurrent games sharing one index per length:
+#   POST   /sessions                {"mode": "entropy", "length": 5}     start a game
+#   POST   /sessions/<id>/results   {"guess": "crane", "result": "_g_y_"} apply a result
+#   GET    /sessions/<id>?k=5                                            recommendation and top k
+#   DELETE /sessions/<id>                                                end a game
+# and a stateless one answered from an lru (one per length) keyed by what the history implies:
+#   POST   /solve   {"history": [{"guess": "crane", "result": "_g_y_"}], "mode": "eliminate", "k": 5, "length": 5}
+#   GET    /solve                                                        cache hits and misses
+#   GET    /stats                                                        counters and latencies
+#
+# a length is only loaded by the first request that asks for it; length defaults to the
+# service's own. sessions idle past the ttl expire, and past max_sessions the least recently
+# used ones go, both checked as sessions are created
+class SolverService:
+    def __init__(self, dictionaries: Dictionaries, workers=None, cache_size=None, length=DEFAULT_WORDLE_LENGTH, max_sessions=MAX_SESSIONS, session_ttl=SESSION_TTL_SECONDS):
+        self.cache_size = DEFAULT_CACHE_SIZE if cache_size is None else cache_size
+        self.dictionaries = dictionaries
+        self.executor = ThreadPoolExecutor(workers)
+        self.length = length
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        # least recently used first; only touched on the event loop
+        self.sessions: Dict[str, Session] = OrderedDict()
+        self.solve_caches: Dict[int, SolveCache] = {}
+        self._lock = threading.Lock()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in [b'\r\n', b'\n', b'']:
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    self.write_response(writer, HTTPStatus.BAD_REQUEST, {'error': 'malformed request'}, False)
+                    break
+                try:
+                    if length < 0:
+                        keep_alive = False # the rest of the stream cannot be framed
+                        raise HttpError(HTTPStatus.BAD_REQUEST, 'invalid content length')
+                    if length > MAX_BODY_BYTES:
+                        keep_alive = False
+                        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'request body too large')
+                    body = await reader.readexactly(length)
+                    status, payload = await self.route(method.upper(), target, body)
+                except HttpError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(e)}
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['sessions'] and method == 'POST':
+            return HTTPStatus.CREATED, await self.create_session(self.parse_body(body))
+        if parts == ['solve'] and method == 'POST':
+            return HTTPStatus.OK, await self.run(self.solve, self.parse_body(body))
+        if parts == ['solve'] and method == 'GET':
+            return HTTPStatus.OK, self.solve_stats()
+        if parts == ['stats'] and method == 'GET':
+            return HTTPStatus.OK, metrics.snapshot()
+        if len(parts) < 2 or parts[0] != 'sessions':
+            raise HttpError(HTTPStatus.NOT_FOUND, 'not found')
+        session_id = parts[1]
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"no session {session_id}")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        if parts[2:] == ['results'] and method == 'POST':
+            request = self.parse_body(body)
+            if not isinstance(request.get('result'), str):
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'result is required')
+            if not isinstance(request.get('guess', ''), (str, type(None))):
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'guess must be a string')
+            async with session.lock:
+                await self.run(session.apply_result, request.get('guess'), request['result'])
+                return HTTPStatus.OK, await self.run(session.recommendation, session_id, DEFAULT_TOP_K)
+        if len(parts) == 2 and method == 'GET':
+            k = self.parse_top_k(parse_qs(url.query).get('k', [DEFAULT_TOP_K])[0])
+            async with session.lock:
+                return HTTPStatus.OK, await self.run(session.recommendation, session_id, k)
+        if len(parts) == 2 and method == 'DELETE':
+            del self.sessions[session_id]
+            return HTTPStatus.OK, {'session': session_id}
+        raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed here")
+
+    async def create_session(self, request):
+        mode = self.parse_mode(request)
+        index, patterns, book, lookahead = await self.run(self.dictionary, request)
+        session_id = uuid.uuid4().hex
+        session = Session(Game(index, patterns=patterns, book=book, lookahead=lookahead), mode)
+        self.expire_sessions(session.last_used)
+        self.sessions[session_id] = session
+        async with session.lock:
+            await self.run(session.update_recommended_guess)
+            return await self.run(session.recommendation, session_id, DEFAULT_TOP_K)
+
+    # loads the length on first use, which can take a while
+    def dictionary(self, request):
+        length = request.get('length', self.length)
+        if not isinstance(length, int) or isinstance(length, bool):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'length must be an integer')
+        try:
+            return self.dictionaries.get(length)
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+
+    # leaves room for one more session
+    def expire_sessions(self, now):
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_used < self.session_ttl and len(self.sessions) < self.max_sessions:
+                break
+            del self.sessions[session_id]
+            metrics.count('server.sessions_expired')
+
+    def parse_body(self, body):
+        if not body:
+            return {}
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'body must be json')
+        if not isinstance(request, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'body must be a json object')
+        return request
+
+    def parse_mode(self, request):
+        try:
+            return GuessMode[request.get('mode', DEFAULT_MODE.name).upper()]
+        except (AttributeError, KeyError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"unknown mode {request.get('mode')}")
+
+    def parse_top_k(self, value):
+        try:
+            return max(0, min(int(value), MAX_TOP_K))
+        except (TypeError, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'k must be an integer')
+
+    # filtering and scoring can take a while (entropy especially), so they run off the event loop
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def solve(self, request):
+        mode = self.parse_mode(request)
+        k = self.parse_top_k(request.get('k', DEFAULT_TOP_K))
+        index, patterns, _, lookahead = self.dictionary(request)
+        history = request.get('history', [])
+        try:
+            pairs = [(entry['guess'].lower(), entry['result']) for entry in history]
+            signature = history_to_signature(index, pairs)
+        except (KeyError, TypeError, AttributeError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'history must be a list of {"guess", "result"} objects')
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        with self._lock:
+            solve_cache = self.solve_caches.get(index.length)
+            if solve_cache is None:
+                solve_cache = self.solve_caches[index.length] = SolveCache(index, patterns, self.cache_size, lookahead)
+        solution, cached = solve_cache.solve(signature, mode)
+        candidates, scores = solve_cache.top_k(solution, k)
+        return {
+            'signature': signature_to_json(signature),
+            'length': index.length,
+            'mode': solution.mode.name.lower(),
+            'guess': None if solution.guess is None else index.wordles[solution.guess],
+            'count': solution.candidates_bits.bit_count(),
+            'candidates': [{'wordle': index.wordles[i], 'score': int(score)} for i, score in zip(candidates, scores)],
+            'cached': cached,
+        }
+
+    # totals over every length played so far, then each length on its own
+    def solve_stats(self):
+        with self._lock:
+            by_length = {str(length): cache.stats() for length, cache in sorted(self.solve_caches.items())}
+        hits = sum(stats['hits'] for stats in by_length.values())
+        misses = sum(stats['misses'] for stats in by_length.values())
+        return {
+            'size': sum(stats['size'] for stats in by_length.values()),
+            'max_size': self.cache_size,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'lengths': by_length,
+        }
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print('serving on', ', '.join(f"http://{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets))
+        async with server:
+            await server.serve_forever()
+
+    def write_response(self, writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive):
+        data = json.dumps(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            'Content-Type: application/json\r\n'
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            '\r\n'
+        )
+        writer.write(head.encode('latin-1') + data)
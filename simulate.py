@@ -0,0 +1,131 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+import numpy as np
+
+from book import OpeningBook
+from const import DEFAULT_WORDLE_LENGTH
+from game import Game
+from index import WordleIndex
+from lookahead import Lookahead
+from patterns import Patterns
+from repl import ELIMINATE_MODES, GuessMode, finish_reason, recommend
+
+CHUNK_SIZE = 64
+LATENCY_PERCENTILES = [50, 90, 99]
+MAX_GUESSES = 6
+
+# set once per worker process so games only ship answers, never the dictionary
+_worker_book: OpeningBook = None
+_worker_index: WordleIndex = None
+_worker_lookahead: Lookahead = None
+_worker_patterns: Patterns = None
+
+# answers and guesses are index ranks; returns how many guesses it took to hit the answer
+# (None if it never did) and how long each turn took
+def play(index: WordleIndex, patterns: Patterns, answer, mode: GuessMode, book: OpeningBook = None, probes=False, lookahead: Lookahead = None):
+    game = Game(index, patterns=patterns, book=book, probes=probes, lookahead=lookahead)
+    latencies = []
+    for n_guesses in range(1, MAX_GUESSES + 1):
+        start = time.perf_counter()
+        if game.candidate_count == 0:
+            break
+        if mode in ELIMINATE_MODES and finish_reason(game) is not None:
+            mode = GuessMode.FINISH
+        guess = recommend(game, mode)
+        latencies.append(time.perf_counter() - start)
+        if guess == answer:
+            return n_guesses, latencies
+        game.apply_pattern(guess, int(patterns.matrix[guess, answer]))
+    return None, latencies
+
+def print_report(report):
+    mode = report['mode'] + (' mode with probes' if report['probes'] else ' mode')
+    print('played', report['games'], 'games in', mode, 'in', f"{report['elapsed_seconds']:.1f}s", 'on', report['workers'], 'workers')
+    print('guesses:')
+    for n_guesses, count in report['histogram'].items():
+        print('', n_guesses, count)
+    print('', 'failed', report['failures'], f"({report['failure_rate']:.2%})")
+    print('mean guesses when solved:', f"{report['mean_guesses']:.3f}")
+    print('turn latency ms:', ' '.join(f"{name} {ms:.3f}" for name, ms in report['latency_ms'].items()))
+
+def simulate(index: WordleIndex, patterns: Patterns, mode: GuessMode, limit=None, workers=None, book: OpeningBook = None, probes=False):
+    answers = list(range(len(index) if limit is None else min(limit, len(index))))
+    chunks = [answers[start:start + CHUNK_SIZE] for start in range(0, len(answers), CHUNK_SIZE)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks) or 1)
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(index, patterns, book)
+        chunk_results = []
+        for chunk in chunks:
+            chunk_results.append(_play_chunk(chunk, mode, probes))
+            _print_progress(len(chunk_results) * CHUNK_SIZE, len(answers))
+    else:
+        # fork shares the already loaded dictionary and memory-mapped patterns with every worker;
+        # elsewhere they are pickled once per worker and the patterns re-open their cache file
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        chunk_results = [None] * len(chunks)
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(index, patterns, book)) as executor:
+            futures = {executor.submit(_play_chunk, chunk, mode, probes): i for i, chunk in enumerate(chunks)}
+            for n_done, future in enumerate(as_completed(futures), 1):
+                chunk_results[futures[future]] = future.result()
+                _print_progress(n_done * CHUNK_SIZE, len(answers))
+    print(file=sys.stderr)
+    results = [(index.wordles[answer], *result) for chunk_result in chunk_results for answer, *result in chunk_result]
+    return summarize(mode, results, time.perf_counter() - start, workers, probes, index.length)
+
+def summarize(mode: GuessMode, results, elapsed_seconds, workers=1, probes=False, length=DEFAULT_WORDLE_LENGTH) -> Dict:
+    histogram: Dict[int, int] = {n_guesses: 0 for n_guesses in range(1, MAX_GUESSES + 1)}
+    failed: List[str] = []
+    latencies = []
+    for answer, n_guesses, game_latencies in results:
+        if n_guesses is None:
+            failed.append(answer)
+        else:
+            histogram[n_guesses] += 1
+        latencies.extend(game_latencies)
+
+    solved = len(results) - len(failed)
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    latency_ms = {f"p{p}": float(np.percentile(latencies_ms, p)) for p in LATENCY_PERCENTILES}
+    latency_ms['max'] = float(latencies_ms.max())
+    return {
+        'mode': mode.name.lower(),
+        'probes': probes,
+        'length': length,
+        'games': len(results),
+        'max_guesses': MAX_GUESSES,
+        'histogram': histogram,
+        'failures': len(failed),
+        'failure_rate': len(failed) / len(results) if results else 0.0,
+        'mean_guesses': sum(n * count for n, count in histogram.items()) / solved if solved else 0.0,
+        'latency_ms': latency_ms,
+        'turns': len(latencies),
+        'elapsed_seconds': elapsed_seconds,
+        'workers': workers,
+        'failed_answers': sorted(failed),
+    }
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+# games are already spread over every core, so each worker searches ahead on its own
+def _init_worker(index, patterns, book):
+    global _worker_book, _worker_index, _worker_lookahead, _worker_patterns
+    _worker_book = book
+    _worker_index = index
+    _worker_lookahead = Lookahead(index, patterns, workers=1)
+    _worker_patterns = patterns
+
+def _play_chunk(answers, mode, probes):
+    return [(answer, *play(_worker_index, _worker_patterns, answer, mode, _worker_book, probes, _worker_lookahead)) for answer in answers]
+
+def _print_progress(n_played, n_total):
+    print(f"\rplayed {min(n_played, n_total)}/{n_total} games", end='', file=sys.stderr, flush=True)
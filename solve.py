@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+from game import Game
+from index import WordleIndex
+from lookahead import Lookahead
+from patterns import Patterns, pattern_to_result, result_to_pattern
+from repl import ELIMINATE_MODES, GuessMode, finish_reason, recommend
+
+DEFAULT_CACHE_SIZE = 10_000
+
+# everything a guess/result history tells us, independent of the order it arrived in; letters
+# yellow at a position stay excluded there even once it is confirmed as another letter, since
+# they are still required somewhere. turns whose guess repeats a letter are kept whole as
+# (guess, pattern): as letter constraints the gray extra copy would rule out the answer
+class Signature(NamedTuple):
+    confirmed: Tuple[Optional[str], ...]
+    excluded: Tuple[FrozenSet[str], ...]
+    required: FrozenSet[str]
+    eliminated: FrozenSet[str]
+    repeated: FrozenSet[Tuple[str, int]]
+
+class Solution(NamedTuple):
+    candidates_bits: int
+    mode: GuessMode
+    guess: Optional[int]
+
+# an lru of signature (and starting mode) to solution, safe to share between executor threads
+class SolveCache:
+    def __init__(self, index: WordleIndex, patterns: Patterns, max_size=DEFAULT_CACHE_SIZE, lookahead: Lookahead = None):
+        self.hits = 0
+        self.index = index
+        self.lookahead = lookahead
+        self.max_size = max_size
+        self.misses = 0
+        self.patterns = patterns
+        self._lock = threading.Lock()
+        self._solutions: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._solutions)
+
+    def solve(self, signature: Signature, mode: GuessMode):
+        key = (signature, mode)
+        with self._lock:
+            solution = self._solutions.get(key)
+            if solution is not None:
+                self._solutions.move_to_end(key)
+                self.hits += 1
+                return solution, True
+            self.misses += 1
+
+        game = signature_to_game(self.index, self.patterns, signature, self.lookahead)
+        if game.candidate_count > 0 and mode in ELIMINATE_MODES and finish_reason(game) is not None:
+            mode = GuessMode.FINISH
+        guess = recommend(game, mode) if game.candidate_count > 0 else None
+        solution = Solution(game.candidates_bits, mode, guess)
+
+        with self._lock:
+            self._solutions[key] = solution
+            self._solutions.move_to_end(key)
+            while len(self._solutions) > self.max_size:
+                self._solutions.popitem(last=False)
+        return solution, False
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._solutions),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def top_k(self, solution: Solution, k):
+        if solution.mode == GuessMode.FINISH:
+            candidates = self.index.top(solution.candidates_bits, k, finish=True)
+            return candidates, self.index.finish_scores[candidates]
+        candidates = self.index.top(solution.candidates_bits, k)
+        return candidates, self.index.scores[candidates]
+
+# raises ValueError for results in the wrong format or greens that contradict each other
+def history_to_signature(index: WordleIndex, history):
+    checked = Game(index)
+    game = Game(index)
+    repeated = set()
+    for guess, result in history:
+        if len(guess) != index.length:
+            raise ValueError(f"guess {guess} must be {index.length} letters")
+        result += ' ' * (index.length - len(result)) # space pad
+        if not checked.apply_colors(guess, result):
+            raise ValueError(f"invalid result format {result.strip()}")
+        if len(set(guess.lower())) == index.length:
+            game.apply_colors(guess, result)
+        else:
+            repeated.add((guess.lower(), result_to_pattern(result)))
+    excluded = tuple(frozenset(game.somewhere_else.get(i, ())) for i in range(index.length))
+    required = frozenset().union(*game.somewhere_else.values())
+    return Signature(tuple(game.confirmed), excluded, required, frozenset(game.eliminated), frozenset(repeated))
+
+# the repeated letter turns narrow exactly when patterns are given
+def signature_to_game(index: WordleIndex, patterns: Patterns, signature: Signature, lookahead: Lookahead = None):
+    game = Game(index, patterns=patterns, lookahead=lookahead)
+    for i, letter in enumerate(signature.confirmed):
+        if letter is not None:
+            game.confirm(letter, i)
+    for i, letters in enumerate(signature.excluded):
+        for letter in sorted(letters):
+            game.somewhere(letter, i)
+    for letter in sorted(signature.eliminated):
+        game.eliminate(letter)
+    for guess, pattern in sorted(signature.repeated):
+        game.apply_colors(guess, pattern_to_result(pattern, index.length))
+    return game
+
+def signature_to_json(signature: Signature):
+    return {
+        'confirmed': ''.join(letter or '_' for letter in signature.confirmed),
+        'excluded': [''.join(sorted(letters)) for letters in signature.excluded],
+        'required': ''.join(sorted(signature.required)),
+        'eliminated': ''.join(sorted(signature.eliminated)),
+        'repeated': [{'guess': guess, 'result': pattern_to_result(pattern, len(guess))} for guess, pattern in sorted(signature.repeated)],
+    }
@@ -0,0 +1,101 @@
+import numpy as np
+
+from patterns import Patterns
+
+# guesses are counted in chunks of about this many buckets, 128 guesses of five letters
+_CHUNK_BUCKETS = 128 * 3 ** 5
+
+# rows of the pattern matrix are guesses and columns are answers; returns the expected
+# information in bits that each guess reveals when the answer is uniformly one of the candidates
+def pattern_entropies(patterns: Patterns, guesses, candidates):
+    entropies = np.zeros(len(guesses), dtype=np.float64)
+    if len(candidates) == 0:
+        return entropies
+    step = _chunk_size(patterns)
+    for start in range(0, len(guesses), step):
+        counts = pattern_counts(patterns, guesses[start:start + step], candidates)
+        weighted = counts * np.log2(counts, where=counts > 0, out=np.zeros(counts.shape))
+        entropies[start:start + len(counts)] = np.log2(len(candidates)) - weighted.sum(axis=1) / len(candidates)
+    return entropies
+
+# the largest bucket each guess can leave and the expected size of the bucket it does leave
+# when the answer is uniformly one of the candidates (the sum of squared bucket sizes over the count)
+def pattern_bucket_sizes(patterns: Patterns, guesses, candidates):
+    worst = np.zeros(len(guesses), dtype=np.int64)
+    expected = np.zeros(len(guesses), dtype=np.float64)
+    if len(candidates) == 0:
+        return worst, expected
+    step = _chunk_size(patterns)
+    for start in range(0, len(guesses), step):
+        counts = pattern_counts(patterns, guesses[start:start + step], candidates)
+        worst[start:start + len(counts)] = counts.max(axis=1)
+        expected[start:start + len(counts)] = (counts * counts).sum(axis=1) / len(candidates)
+    return worst, expected
+
+# the expected number of candidates still left after each guess, where guessing the answer
+# leaves none, so a candidate beats a probe that splits the rest equally well
+def pattern_expected_remaining(patterns: Patterns, guesses, candidates):
+    expected = np.zeros(len(guesses), dtype=np.float64)
+    if len(candidates) == 0:
+        return expected
+    step = _chunk_size(patterns)
+    for start in range(0, len(guesses), step):
+        counts = pattern_counts(patterns, guesses[start:start + step], candidates)
+        counts[:, patterns.solved] = 0
+        expected[start:start + len(counts)] = (counts * counts).sum(axis=1) / len(candidates)
+    return expected
+
+# the expected candidates left after each guess summed over several boards' candidate sets, each
+# counted weight times (boards with the same candidates are only scored once); each chunk of
+# guess rows is read once and every board's candidates are gathered from it and counted in a
+# single bincount rather than one of each per board
+def combined_expected_remaining(patterns: Patterns, guesses, candidate_sets, weights):
+    expected = np.zeros(len(guesses), dtype=np.float64)
+    sizes = np.array([len(candidates) for candidates in candidate_sets], dtype=np.float64)
+    if len(candidate_sets) == 0 or not sizes.all():
+        return expected
+    columns = np.concatenate(candidate_sets)
+    offsets = np.repeat(np.arange(len(candidate_sets)) * patterns.count, sizes.astype(np.intp))
+    scale = np.asarray(weights, dtype=np.float64) / sizes
+    width = len(candidate_sets) * patterns.count
+    # as many buckets per chunk as the single board functions, so the counts stay in cache
+    step = max(_chunk_size(patterns) // len(candidate_sets), 1)
+    for start in range(0, len(guesses), step):
+        chunk = guesses[start:start + step]
+        rows = np.add(patterns.matrix[chunk][:, columns], offsets + (np.arange(len(chunk)) * width)[:, None], dtype=np.intp)
+        counts = np.bincount(rows.ravel(), minlength=len(chunk) * width).reshape(len(chunk), len(candidate_sets), patterns.count)
+        counts[:, :, patterns.solved] = 0
+        expected[start:start + len(chunk)] = (counts * counts).sum(axis=2) @ scale
+    return expected
+
+# the candidates guess splits the candidates into, besides the solved one, biggest first (so
+# bounds bite early in the searches that walk them) and ties in pattern order
+def pattern_buckets(patterns: Patterns, guess, candidates):
+    row = np.asarray(patterns.matrix[guess, candidates])
+    order = np.argsort(row, kind='stable')
+    starts = np.flatnonzero(np.diff(row[order])) + 1
+    buckets = [candidates[bucket] for bucket in np.split(order, starts) if row[bucket[0]] != patterns.solved]
+    buckets.sort(key=len, reverse=True)
+    return buckets
+
+# how many buckets besides the solved one each guess splits the candidates into and the sum of
+# their squared sizes
+def pattern_split_sizes(patterns: Patterns, guesses, candidates):
+    n_buckets = np.zeros(len(guesses), dtype=np.int64)
+    squares = np.zeros(len(guesses), dtype=np.int64)
+    step = _chunk_size(patterns)
+    for start in range(0, len(guesses), step):
+        counts = pattern_counts(patterns, guesses[start:start + step], candidates)
+        counts[:, patterns.solved] = 0
+        n_buckets[start:start + len(counts)] = (counts > 0).sum(axis=1)
+        squares[start:start + len(counts)] = (counts * counts).sum(axis=1)
+    return n_buckets, squares
+
+# one row per guess of how many candidates land in each of the pattern count buckets
+def pattern_counts(patterns: Patterns, guesses, candidates):
+    rows = patterns.matrix[np.ix_(guesses, candidates)].astype(np.intp)
+    rows += (np.arange(len(guesses)) * patterns.count)[:, None]
+    return np.bincount(rows.ravel(), minlength=len(guesses) * patterns.count).reshape(len(guesses), patterns.count)
+
+def _chunk_size(patterns: Patterns):
+    return max(_CHUNK_BUCKETS // patterns.count, 1)
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dictionary import WORDLE_TO_USAGE_PATH, WORDLES_PATH, Dictionary, fetch_wordle_to_usage, fetch_wordles_from_csv
+from frequency import wordles_to_frequencies
+from index import WordleIndex
+from patterns import Patterns, wordles_to_pattern_matrix
+from server import SolverService
+
+# a dictionary small enough to search exhaustively, with repeated letters and shared greens
+SMALL_WORDLES = [
+    'abbey', 'alley', 'apple', 'arise', 'babes', 'belle', 'crane', 'crate', 'eerie', 'geese',
+    'label', 'lapse', 'later', 'leech', 'level', 'llama', 'paper', 'pleat', 'sheep', 'slate',
+    'speed', 'spell', 'steel', 'stole', 'trace', 'treat', 'tweet', 'vivid',
+]
+
+# serves one five letter dictionary without patterns, enough for the eliminate and finish modes
+class OneDictionary:
+    def __init__(self, index):
+        self.dictionary = Dictionary(index, None, None, None)
+
+    def get(self, length=5):
+        if length != self.dictionary.index.length:
+            raise ValueError(f"no {length} letter wordles")
+        return self.dictionary
+
+def build_index(wordles, wordle_to_usage=None):
+    wordles = sorted(wordles)
+    return WordleIndex(wordles, wordles_to_frequencies(wordles), wordle_to_usage)
+
+def build_patterns(index):
+    return Patterns(index.wordles, wordles_to_pattern_matrix(index.wordles))
+
+# the real five letter dictionary, built from the csvs without touching data/cache
+@pytest.fixture(scope='session')
+def index():
+    wordles = fetch_wordles_from_csv(os.path.join(ROOT, WORDLES_PATH), 5)
+    return build_index(wordles, fetch_wordle_to_usage(os.path.join(ROOT, WORDLE_TO_USAGE_PATH), 5))
+
+@pytest.fixture(scope='session')
+def patterns(index):
+    return build_patterns(index)
+
+@pytest.fixture(scope='session')
+def small_index():
+    return build_index(SMALL_WORDLES)
+
+@pytest.fixture(scope='session')
+def small_patterns(small_index):
+    return build_patterns(small_index)
+
+@pytest.fixture
+def service(index):
+    service = SolverService(OneDictionary(index))
+    yield service
+    service.executor.shutdown()
@@ -0,0 +1,31 @@
+import numpy as np
+
+from book import BOOK_MODES, build_opening_book, read_opening_book, write_opening_book
+from game import Game
+from repl import recommend
+
+def test_book_round_trip(tmp_path, small_index, small_patterns):
+    book = build_opening_book(small_index, small_patterns)
+    path = str(tmp_path / 'book.json')
+    write_opening_book(path, small_index, book)
+    loaded = read_opening_book(path, small_index)
+    assert loaded.first == book.first
+    assert loaded.second == book.second
+
+# the book answers what a live search would on the first two turns of any mode's first guess,
+# and nothing after
+def test_book_lookup_matches_live_search(small_index, small_patterns):
+    book = build_opening_book(small_index, small_patterns)
+    for mode in BOOK_MODES:
+        assert Game(small_index, patterns=small_patterns, book=book).book_guess(mode) == recommend(Game(small_index, patterns=small_patterns), mode)
+    for first in set(book.first.values()):
+        for pattern in np.unique(small_patterns.matrix[first]).tolist():
+            booked = Game(small_index, patterns=small_patterns, book=book)
+            booked.apply_pattern(first, pattern)
+            live = Game(small_index, patterns=small_patterns)
+            live.apply_pattern(first, pattern)
+            for mode in BOOK_MODES:
+                assert booked.book_guess(mode) == recommend(live, mode)
+            second = book.second[BOOK_MODES[0]][(first, pattern)][0]
+            booked.apply_pattern(second, int(small_patterns.matrix[second, booked.candidate_indices[0]]))
+            assert booked.book_guess(BOOK_MODES[0]) is None
@@ -0,0 +1,38 @@
+import numpy as np
+
+from bundle import load_bundle, sources_checksum, write_bundle
+
+def test_bundle_round_trip(tmp_path, index):
+    path = str(tmp_path / 'wordles-5.bundle')
+    checksum = b'\1' * 32
+    write_bundle(path, checksum, index)
+    loaded = load_bundle(path, checksum, index.length).to_index(0)
+    assert loaded.wordles == index.wordles
+    assert (loaded.scores == index.scores).all()
+    assert dict(loaded.wordle_to_usage) == {wordle: usage for wordle, usage in index.wordle_to_usage.items() if wordle in index.wordle_to_i}
+    assert (loaded.finish_order == index.finish_order).all()
+    assert (loaded.frequencies.letter_scores == index.frequencies.letter_scores).all()
+    assert loaded.digest() == index.digest()
+
+def test_bundle_applies_the_usage_threshold(tmp_path, index):
+    path = str(tmp_path / 'wordles-5.bundle')
+    write_bundle(path, b'\0' * 32, index)
+    loaded = load_bundle(path, b'\0' * 32, index.length).to_index(100_000)
+    assert all(usage >= 100_000 for usage in loaded.wordle_to_usage.values())
+    assert np.isin(np.array(list(loaded.wordle_to_usage)), np.array(list(index.wordle_to_usage))).all()
+
+def test_stale_or_foreign_bundles_are_not_loaded(tmp_path, small_index):
+    path = str(tmp_path / 'wordles-5.bundle')
+    write_bundle(path, b'\1' * 32, small_index)
+    assert load_bundle(path, b'\2' * 32, 5) is None
+    assert load_bundle(path, b'\1' * 32, 6) is None
+    assert load_bundle(str(tmp_path / 'missing.bundle'), b'\1' * 32, 5) is None
+
+def test_sources_checksum_follows_content(tmp_path):
+    a = tmp_path / 'a.csv'
+    b = tmp_path / 'b.csv'
+    a.write_text('crane,1\n')
+    b.write_text('crane,1\n')
+    assert sources_checksum([str(a)]) == sources_checksum([str(b)])
+    b.write_text('crane,2\n')
+    assert sources_checksum([str(a)]) != sources_checksum([str(b)])
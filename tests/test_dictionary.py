@@ -0,0 +1,28 @@
+import pytest
+
+import dictionary
+from dictionary import fetch_wordle_to_usage
+
+GWORDLIST = (
+    '#RANK\tWORD                \tCOUNT\tPERCENT\tCUMULATIVE\n'
+    '1\tthe                 \t3,923,110,734\t5.1%\t5.1%\n'
+    '2\tWhich               \t1,234,567\t0.1%\t5.2%\n'
+    '3\tcrane               \t98,765\t0.1%\t5.3%\n'
+    '4\tcranes              \t55,000\t0.1%\t5.4%\n'
+    '5\tcrane               \t99,000\t0.1%\t5.5%\n'
+    '6\tslate               \t12\t0.0%\t5.5%'
+)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_gwordlist_usage(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(dictionary, 'USAGE_BLOCK_BYTES', 16) # rows cut across blocks
+    path = tmp_path / 'frequency.txt'
+    path.write_text(GWORDLIST)
+    assert fetch_wordle_to_usage(str(path), 5, 0, workers) == {'which': 1_234_567, 'crane': 99_000, 'slate': 12}
+    assert fetch_wordle_to_usage(str(path), 5, 100, workers) == {'which': 1_234_567, 'crane': 99_000}
+    assert fetch_wordle_to_usage(str(path), 6, 0, workers) == {'cranes': 55_000}
+
+def test_csv_usage(tmp_path):
+    path = tmp_path / 'frequencies.csv'
+    path.write_text('which,3140239565\ncrane,"1,234"\nabc,5\nslate , 7\n')
+    assert fetch_wordle_to_usage(str(path), 5) == {'which': 3_140_239_565, 'crane': 1234, 'slate': 7}
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from game import Game
+from index import indices_to_bits
+from patterns import feedback, pattern_to_result, result_to_pattern
+
+def test_rejected_wordles_are_never_probed(small_index, small_patterns):
+    game = Game(small_index, patterns=small_patterns, probes=True)
+    game.apply_colors('crane', pattern_to_result(feedback('crane', 'sheep'), small_index.length))
+    candidates = game.candidates_bits
+    # rejecting wordles that are not candidates leaves the candidates alone
+    for i, wordle in enumerate(small_index.wordles):
+        if not candidates & (1 << i):
+            game.reject(wordle)
+    assert game.candidates_bits == candidates
+    probe = game.best_probe()
+    assert candidates & (1 << probe)
+    game.reject(small_index.wordles[probe])
+    assert game.best_probe() != probe
+    assert game.candidates_bits == candidates & ~(1 << probe)
+
+def consistent(index, history):
+    return {
+        i for i, answer in enumerate(index.wordles)
+        if all(feedback(guess, answer) == result_to_pattern(result) for guess, result in history)
+    }
+
+# with patterns a game narrows to exactly the answers that would give every result, repeated
+# letters included
+def test_candidates_are_the_answers_consistent_with_every_result(index, patterns):
+    rng = random.Random(7)
+    for _ in range(15):
+        answer = rng.choice(index.wordles)
+        game = Game(index, patterns=patterns)
+        history = []
+        for guess in rng.sample(index.wordles, 3) + ['eerie']:
+            result = pattern_to_result(feedback(guess, answer), index.length)
+            history.append((guess, result))
+            assert game.apply_colors(guess, result)
+            assert set(game.candidate_indices.tolist()) == consistent(index, history), history
+        assert game.candidates_bits & index.bit(answer)
+
+# without patterns only guesses without repeated letters are exact as letter constraints
+def test_letter_constraints_are_exact_without_repeated_letters(index):
+    rng = random.Random(7)
+    guesses = [wordle for wordle in index.wordles if len(set(wordle)) == len(wordle)]
+    for _ in range(15):
+        answer = rng.choice(index.wordles)
+        game = Game(index)
+        history = []
+        for guess in rng.sample(guesses, 3):
+            result = pattern_to_result(feedback(guess, answer), index.length)
+            history.append((guess, result))
+            assert game.apply_colors(guess, result)
+            assert set(game.candidate_indices.tolist()) == consistent(index, history), history
+
+def test_batched_and_turn_by_turn_filtering_agree(index):
+    history = [(guess, pattern_to_result(feedback(guess, 'adobe'), index.length)) for guess in ['crane', 'moist', 'abode']]
+    batched = Game(index)
+    stepped = Game(index)
+    for guess, result in history:
+        batched.apply_colors(guess, result)
+        stepped.apply_colors(guess, result)
+        stepped.candidates_bits
+    assert batched.candidates_bits == stepped.candidates_bits
+
+@pytest.mark.parametrize('with_patterns', [False, True])
+def test_apply_pattern_matches_apply_colors(small_index, small_patterns, with_patterns):
+    patterns = small_patterns if with_patterns else None
+    for guess in small_index.wordles:
+        for answer in small_index.wordles:
+            by_colors = Game(small_index, patterns=patterns)
+            by_colors.apply_colors(guess, pattern_to_result(feedback(guess, answer), small_index.length))
+            by_pattern = Game(small_index, patterns=patterns)
+            by_pattern.apply_pattern(small_index.wordle_to_i[guess], feedback(guess, answer))
+            assert by_colors.candidates_bits == by_pattern.candidates_bits
+
+def test_invalid_results_are_refused(index):
+    game = Game(index)
+    assert not game.apply_colors('crane', '__x__')
+
+def test_bits_round_trip_and_rank_order(small_index):
+    rng = random.Random(1)
+    for _ in range(50):
+        ranks = sorted(rng.sample(range(len(small_index)), rng.randint(0, len(small_index))))
+        bits = small_index.encode(ranks)
+        assert bits == indices_to_bits(ranks)
+        assert small_index.decode_array(bits).tolist() == ranks
+        assert small_index.top(bits, 3) == ranks[:3]
+        by_finish = sorted(ranks, key=lambda i: (-small_index.finish_scores[i], small_index.finish_positions[i]))
+        assert small_index.top(bits, 3, finish=True) == by_finish[:3]
+        assert list(small_index.ranked(bits)) == ranks
@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+import pytest
+
+from lookahead import Lookahead
+from strategy import pattern_expected_remaining
+
+def candidate_sets(index, n):
+    rng = random.Random(3)
+    return [index.encode(sorted(rng.sample(range(len(index)), rng.randint(3, len(index))))) for _ in range(n)]
+
+def test_pool_and_sequential_searches_agree(small_index, small_patterns):
+    sequential = Lookahead(small_index, small_patterns, workers=1, budget=60)
+    pooled = Lookahead(small_index, small_patterns, workers=2, budget=60)
+    try:
+        for bits in candidate_sets(small_index, 20):
+            assert pooled.best_guess(bits) == sequential.best_guess(bits)
+            assert bits in pooled._best and bits in sequential._best
+    finally:
+        if pooled._executor is not None:
+            pooled._executor.shutdown()
+
+# past the budget the one-ply pick is played and not remembered
+def test_searches_past_the_budget_fall_back_to_one_ply(small_index, small_patterns):
+    lookahead = Lookahead(small_index, small_patterns, workers=1, budget=0)
+    for bits in candidate_sets(small_index, 5):
+        candidates = small_index.decode_array(bits)
+        expected = pattern_expected_remaining(small_patterns, candidates, candidates)
+        assert lookahead.best_guess(bits) == candidates[np.lexsort((candidates, expected))[0]]
+        assert bits not in lookahead._best
+
+# a cancelled search settles like one past its budget, on the pool too
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cancelled_searches_fall_back_to_one_ply(small_index, small_patterns, workers):
+    lookahead = Lookahead(small_index, small_patterns, workers=workers, budget=60)
+    try:
+        for bits in candidate_sets(small_index, 5):
+            candidates = small_index.decode_array(bits)
+            expected = pattern_expected_remaining(small_patterns, candidates, candidates)
+            assert lookahead.best_guess(bits, cancelled=lambda: True) == candidates[np.lexsort((candidates, expected))[0]]
+            assert bits not in lookahead._best
+    finally:
+        if lookahead._executor is not None:
+            lookahead._executor.shutdown()
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+import metrics
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.enable(False)
+    metrics.reset()
+
+def test_nothing_is_recorded_while_off():
+    metrics.reset()
+    metrics.count('off.count')
+    metrics.observe('off.timer', 0.001)
+    with metrics.timer('off.block'):
+        pass
+    metrics.timed('off.call')(lambda: None)()
+    assert metrics.snapshot() == {'enabled': False, 'counters': {}, 'timers': {}}
+
+def test_counters_and_timers_are_recorded(recording):
+    metrics.count('a.count')
+    metrics.count('a.count', 2)
+    with metrics.timer('a.block'):
+        pass
+    @metrics.timed('a.call')
+    def fails():
+        raise ValueError()
+    with pytest.raises(ValueError):
+        fails()
+    stats = json.loads(metrics.to_json())
+    assert stats['counters'] == {'a.count': 3}
+    assert stats['timers']['a.block']['count'] == stats['timers']['a.call']['count'] == 1
+
+# 1 ms lands in the bucket under 1024 us, and percentiles never pass the slowest seen
+def test_histogram_buckets_and_percentiles():
+    histogram = metrics.Histogram()
+    for _ in range(9):
+        histogram.observe(0.001)
+    histogram.observe(0.5)
+    summary = histogram.to_json()
+    assert summary['buckets_us'] == {'1024': 9, str(2 ** 19): 1}
+    assert summary['p50_ms'] == summary['p90_ms'] == 1.024
+    assert summary['p99_ms'] == summary['max_ms'] == 500.0
+    assert summary['mean_ms'] == pytest.approx(50.9)
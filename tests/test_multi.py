@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from multi import MultiGame
+from patterns import feedback, pattern_to_result
+
+# best_guess played against random answers keeps every answer on its board until it is guessed
+@pytest.mark.parametrize('seed', range(3))
+def test_boards_keep_their_answers_until_solved(small_index, small_patterns, seed):
+    rng = random.Random(seed)
+    answers = rng.sample(small_index.wordles, 4)
+    game = MultiGame(small_index, small_patterns, len(answers))
+    guessed = set()
+    while not game.done:
+        assert game.turns < 12
+        guess = small_index.wordles[game.best_guess()]
+        guessed.add(guess)
+        results = [pattern_to_result(feedback(guess, answer), small_index.length) for answer in answers]
+        assert game.apply_colors(guess, results)
+        for board, answer in enumerate(answers):
+            assert game.solved[board] == (answer in guessed)
+            assert game.candidates_bits[board] & small_index.bit(answer)
+
+# results for only the unsolved boards are read like a full set
+def test_unsolved_only_results_match_full_results(small_index, small_patterns):
+    answers = ['sheep', 'llama', 'trace']
+    full = MultiGame(small_index, small_patterns, len(answers))
+    short = MultiGame(small_index, small_patterns, len(answers))
+    for guess in ['trace', 'speed']:
+        results = [pattern_to_result(feedback(guess, answer), small_index.length) for answer in answers]
+        assert full.apply_colors(guess, results)
+        assert short.apply_colors(guess, [result for board, result in enumerate(results) if not short.solved[board]])
+    assert full.candidates_bits == short.candidates_bits
+    assert full.solved == short.solved == [False, False, True]
+
+def test_unreadable_guesses_or_results_change_nothing(small_index, small_patterns):
+    game = MultiGame(small_index, small_patterns, 2)
+    for guess, results in [('crane', ['g____', '__x__']), ('cran', ['g____', '_____']), ('cr4ne', ['g____', '_____']), ('crane', ['g____'])]:
+        assert not game.apply_colors(guess, results)
+    assert game.candidates_bits == [small_index.all, small_index.all]
+    assert game.turns == 0
@@ -0,0 +1,67 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from optimal import OptimalSolver, _strategy_to_json, heuristic_total, write_optimal_tree
+from patterns import feedback
+from repl import GuessMode
+from simulate import play
+from tree import load_tree
+
+# the fewest total guesses over members by trying every candidate at every turn
+def brute_force_total(wordles, members):
+    @lru_cache(maxsize=None)
+    def total(members):
+        if len(members) == 1:
+            return 1
+        best = None
+        for guess in members:
+            buckets = {}
+            for answer in members:
+                if answer != guess:
+                    buckets.setdefault(feedback(wordles[guess], wordles[answer]), []).append(answer)
+            guess_total = len(members) + sum(total(tuple(bucket)) for bucket in buckets.values())
+            best = guess_total if best is None else min(best, guess_total)
+        return best
+    return total(tuple(members))
+
+# every answer's guess count under strategy, summed
+def strategy_total(patterns, strategy, members, depth=1):
+    total = depth
+    for pattern, child in strategy['children'].items():
+        bucket = [m for m in members if patterns.matrix[strategy['guess'], m] == pattern]
+        total += strategy_total(patterns, child, bucket, depth + 1)
+    return total
+
+@pytest.mark.parametrize('seed', range(6))
+def test_optimal_matches_brute_force(small_index, small_patterns, seed):
+    rng = random.Random(seed)
+    members = np.array(sorted(rng.sample(range(len(small_index)), rng.randint(3, 9))))
+    expected = brute_force_total(small_index.wordles, members.tolist())
+    solver = OptimalSolver(small_patterns)
+    assert solver.solve(members) == expected
+    assert strategy_total(small_patterns, solver.strategy(members), members.tolist()) == expected
+    assert expected <= heuristic_total(small_index, small_patterns, members)
+
+def test_bounded_solve_only_promises_a_lower_bound(small_index, small_patterns):
+    members = np.arange(9)
+    exact = OptimalSolver(small_patterns).solve(members)
+    assert OptimalSolver(small_patterns).solve(members, bound=exact - 1) >= exact - 1
+    assert OptimalSolver(small_patterns).solve(members, bound=exact + 1) == exact
+
+def test_full_strategy_tree_loads(tmp_path, small_index, small_patterns):
+    members = np.arange(len(small_index))
+    strategy = OptimalSolver(small_patterns).strategy(members)
+    path = str(tmp_path / 'tree-optimal-5.bin')
+    write_optimal_tree(path, small_index, _strategy_to_json(small_index, strategy))
+    tree = load_tree(path, small_index)
+    assert tree is not None and tree.counts[0] == len(small_index) == len(tree)
+
+# the heuristic is the guesses eliminate mode really plays, finish switch included
+def test_heuristic_total_is_what_eliminate_mode_plays(small_index, small_patterns):
+    members = np.arange(len(small_index))
+    played = [play(small_index, small_patterns, answer, GuessMode.ELIMINATE)[0] for answer in members.tolist()]
+    assert None not in played
+    assert heuristic_total(small_index, small_patterns, members) == sum(played)
@@ -0,0 +1,36 @@
+import random
+import string
+
+import numpy as np
+import pytest
+
+from patterns import feedback, pattern_dtype, pattern_to_result, result_to_pattern, wordles_to_pattern_matrix
+
+# repeated letters on either side, including more copies in the guess than in the answer
+REPEATED = ['speed', 'abide', 'eerie', 'geese', 'sheep', 'level', 'llama', 'allay', 'belle', 'ebbed']
+
+def test_matrix_matches_feedback_with_repeated_letters():
+    matrix = wordles_to_pattern_matrix(REPEATED)
+    for i, guess in enumerate(REPEATED):
+        for j, answer in enumerate(REPEATED):
+            assert matrix[i, j] == feedback(guess, answer), (guess, answer)
+
+def test_repeated_letters_are_only_yellow_while_unmatched():
+    assert pattern_to_result(feedback('speed', 'abide'), 5) == '__y_y'
+    assert pattern_to_result(feedback('eerie', 'geese'), 5) == 'yg__g'
+    assert pattern_to_result(feedback('llama', 'allay'), 5) == 'ygy_y'
+
+@pytest.mark.parametrize('length', [4, 5, 6, 8, 11])
+def test_matrix_matches_feedback_at_every_length(length):
+    rng = random.Random(length)
+    # a small alphabet so most pairs share letters, many of them repeated
+    wordles = [''.join(rng.choice('abcde') for _ in range(length)) for _ in range(60)]
+    others = [''.join(rng.choice(string.ascii_lowercase[:8]) for _ in range(length)) for _ in range(40)]
+    matrix = wordles_to_pattern_matrix(wordles, others)
+    assert matrix.dtype == pattern_dtype(length)
+    expected = np.array([[feedback(guess, answer) for answer in others] for guess in wordles])
+    assert (matrix == expected).all()
+
+def test_results_round_trip():
+    for pattern in range(3 ** 5):
+        assert result_to_pattern(pattern_to_result(pattern, 5)) == pattern
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from game import Game
+from repl import GuessMode, Speculation, recommend
+
+# a taken pattern the thread finished is the game and guess a live search would reach
+@pytest.mark.parametrize('mode', [GuessMode.ELIMINATE, GuessMode.ENTROPY])
+def test_speculated_patterns_match_live_play(small_index, small_patterns, mode):
+    game = Game(small_index, patterns=small_patterns)
+    guess = recommend(game, mode)
+    speculation = Speculation(game, guess, mode)
+    speculation._thread.join()
+    for pattern in np.unique(small_patterns.matrix[guess, game.candidate_indices]).tolist():
+        if pattern == small_patterns.solved:
+            continue
+        speculated = speculation.take(pattern)
+        live = game.copy()
+        live.apply_pattern(guess, pattern)
+        assert speculated.game.candidates_bits == live.candidates_bits
+        assert speculated.guess == recommend(live, speculated.mode)
+
+# patterns no candidate gives are never speculated
+def test_unspeculated_patterns_miss(small_index, small_patterns):
+    game = Game(small_index, patterns=small_patterns)
+    guess = recommend(game, GuessMode.ELIMINATE)
+    given = set(small_patterns.matrix[guess, game.candidate_indices].tolist())
+    missing = next(pattern for pattern in range(small_patterns.count) if pattern not in given)
+    speculation = Speculation(game, guess, GuessMode.ELIMINATE)
+    speculation._thread.join()
+    assert speculation.take(missing) is None
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from server import HttpError
+
+def exchange(service, request):
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(request)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 10) # read to eof: the server must close
+            writer.close()
+            return response
+    return asyncio.run(run())
+
+def test_negative_content_length_is_rejected_and_closes(service):
+    response = exchange(service, b'POST /solve HTTP/1.1\r\nContent-Length: -1\r\n\r\n{}')
+    head, _, body = response.partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 400')
+    assert b'Connection: close' in head
+    assert json.loads(body) == {'error': 'invalid content length'}
+
+def test_non_string_guess_is_a_bad_request(service):
+    async def run():
+        _, created = await service.route('POST', '/sessions', b'{}')
+        body = json.dumps({'result': '_y___', 'guess': 5}).encode('utf-8')
+        with pytest.raises(HttpError) as e:
+            await service.route('POST', f"/sessions/{created['session']}/results", body)
+        return e.value
+    error = asyncio.run(run())
+    assert error.status == 400
+    assert str(error) == 'guess must be a string'
+
+def post_result(service, session_id, guess, result):
+    body = json.dumps({'guess': guess, 'result': result}).encode('utf-8')
+    return service.route('POST', f"/sessions/{session_id}/results", body)
+
+# a refused result, malformed (400) or contradicting a green (409), leaves the game untouched
+@pytest.mark.parametrize('result, status', [('gg_x_', 400), ('g____', 409)])
+def test_refused_results_leave_the_session_alone(service, result, status):
+    async def run():
+        _, created = await service.route('POST', '/sessions', b'{}')
+        session_id = created['session']
+        await post_result(service, session_id, 'crane', 'g____')
+        session = service.sessions[session_id]
+        before = (session.game.candidates_bits, list(session.game.confirmed), set(session.game.eliminated), session.guess)
+        with pytest.raises(HttpError) as e:
+            await post_result(service, session_id, 'arise', result)
+        after = (session.game.candidates_bits, list(session.game.confirmed), set(session.game.eliminated), session.guess)
+        return e.value, before, after
+    error, before, after = asyncio.run(run())
+    assert error.status == status
+    assert after == before
+
+def test_sessions_past_the_cap_or_idle_past_the_ttl_expire(service):
+    async def run():
+        service.max_sessions = 2
+        ids = [(await service.route('POST', '/sessions', b'{}'))[1]['session'] for _ in range(2)]
+        await service.route('GET', f"/sessions/{ids[0]}", b'') # the first is now the most recent
+        ids.append((await service.route('POST', '/sessions', b'{}'))[1]['session'])
+        assert list(service.sessions) == [ids[0], ids[2]]
+
+        service.session_ttl = 0
+        ids.append((await service.route('POST', '/sessions', b'{}'))[1]['session'])
+        assert list(service.sessions) == [ids[3]]
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from game import Game
+from patterns import feedback, pattern_to_result
+from solve import history_to_signature, signature_to_game
+
+# a yellow whose position a later green confirms as another letter
+CONFIRMED_YELLOW = [('trace', 'y_g__'), ('shown', 'g___g')]
+
+def live_candidates(index, history, patterns=None):
+    game = Game(index, patterns=patterns)
+    for guess, result in history:
+        assert game.apply_colors(guess, result)
+        game.candidates_bits # validated turn by turn, as a session does
+    return game.candidates_bits
+
+def solve(service, history):
+    body = json.dumps({'history': [{'guess': guess, 'result': result} for guess, result in history]})
+    status, response = asyncio.run(service.route('POST', '/solve', body.encode('utf-8')))
+    assert status == 200
+    return response
+
+def test_solve_keeps_yellows_at_confirmed_positions(index, service):
+    response = solve(service, CONFIRMED_YELLOW)
+    assert response['signature']['required'] == 't'
+    assert response['count'] == live_candidates(index, CONFIRMED_YELLOW).bit_count() == 1
+    assert response['guess'] == 'stain'
+
+def test_confirmed_yellow_signature_differs_from_no_yellow(index):
+    without = [('trace', '__g__'), ('shown', 'g___g')]
+    assert history_to_signature(index, CONFIRMED_YELLOW) != history_to_signature(index, without)
+
+# repeated letter guesses included, which the signature keeps whole
+@pytest.mark.parametrize('seed', range(4))
+def test_signature_replay_matches_live_game(index, patterns, seed):
+    rng = random.Random(seed)
+    for _ in range(250):
+        answer = rng.choice(index.wordles)
+        history = [(guess, pattern_to_result(feedback(guess, answer), index.length)) for guess in rng.sample(index.wordles, rng.randint(1, 4))]
+        replayed = signature_to_game(index, patterns, history_to_signature(index, history)).candidates_bits
+        assert replayed == live_candidates(index, history, patterns), history
+        assert replayed & index.bit(answer)
+
+def test_signature_ignores_history_order(index):
+    history = [('crane', pattern_to_result(feedback('crane', 'stain'), 5)), ('moist', pattern_to_result(feedback('moist', 'stain'), 5)), ('shown', pattern_to_result(feedback('shown', 'stain'), 5))]
+    signatures = {history_to_signature(index, history[i:] + history[:i]) for i in range(len(history))}
+    assert len(signatures) == 1
+
+def test_repeated_letter_turns_keep_the_answer(index, patterns):
+    history = [('eerie', pattern_to_result(feedback('eerie', 'crane'), 5))]
+    signature = history_to_signature(index, history)
+    assert signature.repeated == frozenset([('eerie', feedback('eerie', 'crane'))])
+    assert signature_to_game(index, patterns, signature).candidates_bits & index.bit('crane')
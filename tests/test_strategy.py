@@ -0,0 +1,52 @@
+import math
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from game import Game
+from patterns import feedback, pattern_to_result
+from strategy import pattern_bucket_sizes, pattern_entropies
+
+def buckets(wordles, guess, candidates):
+    return Counter(feedback(wordles[guess], wordles[answer]) for answer in candidates).values()
+
+def entropy(wordles, guess, candidates):
+    return -sum(n / len(candidates) * math.log2(n / len(candidates)) for n in buckets(wordles, guess, candidates))
+
+# every guess in the dictionary, spread over several chunks of the count
+def test_entropies_match_bucket_counts(index, patterns):
+    rng = random.Random(5)
+    candidates = np.array(sorted(rng.sample(range(len(index)), 40)))
+    entropies = pattern_entropies(patterns, np.arange(len(index)), candidates)
+    for guess in rng.sample(range(len(index)), 100):
+        assert entropies[guess] == pytest.approx(entropy(index.wordles, guess, candidates.tolist()))
+
+@pytest.mark.parametrize('answer', ['sheep', 'llama', 'trace'])
+def test_entropy_picks_the_most_informative_candidate(small_index, small_patterns, answer):
+    game = Game(small_index, patterns=small_patterns)
+    game.apply_colors('crane', pattern_to_result(feedback('crane', answer), small_index.length))
+    candidates = game.candidate_indices.tolist()
+    best = max(entropy(small_index.wordles, guess, candidates) for guess in candidates)
+    assert entropy(small_index.wordles, game.best_candidate_by_entropy(), candidates) == pytest.approx(best)
+
+def test_bucket_sizes_match_bucket_counts(index, patterns):
+    rng = random.Random(6)
+    candidates = np.array(sorted(rng.sample(range(len(index)), 40)))
+    worst, expected = pattern_bucket_sizes(patterns, np.arange(len(index)), candidates)
+    for guess in rng.sample(range(len(index)), 100):
+        sizes = buckets(index.wordles, guess, candidates.tolist())
+        assert worst[guess] == max(sizes)
+        assert expected[guess] == pytest.approx(sum(n * n for n in sizes) / len(candidates))
+
+# the smallest worst case bucket, then the smallest expected one, then the best ranked candidate
+@pytest.mark.parametrize('answer', ['sheep', 'llama', 'trace'])
+def test_minimax_picks_the_smallest_worst_case(small_index, small_patterns, answer):
+    game = Game(small_index, patterns=small_patterns)
+    game.apply_colors('crane', pattern_to_result(feedback('crane', answer), small_index.length))
+    candidates = game.candidate_indices.tolist()
+    def key(guess):
+        sizes = buckets(small_index.wordles, guess, candidates)
+        return max(sizes), sum(n * n for n in sizes), guess
+    assert game.best_candidate_by_minimax() == min(candidates, key=key)
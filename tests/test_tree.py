@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from game import Game
+from optimal import OptimalSolver, _strategy_to_json, write_optimal_tree
+from patterns import feedback
+from repl import GuessMode
+from tree import build_tree, fetch_tree, load_tree, write_tree
+
+@pytest.mark.parametrize('mode', [GuessMode.ELIMINATE, GuessMode.MINIMAX])
+def test_tree_round_trip(tmp_path, small_index, small_patterns, mode):
+    sections = build_tree(small_index, small_patterns, mode)
+    path = str(tmp_path / 'tree.bin')
+    write_tree(path, small_index, mode, sections)
+    tree = load_tree(path, small_index)
+    assert tree.mode == mode
+    for section, loaded in zip(sections, [tree.guesses, tree.modes, tree.counts, tree.edge_starts, tree.edge_patterns, tree.edge_children]):
+        assert section.tolist() == loaded.tolist()
+    assert tree.counts[0] == len(small_index)
+
+# every answer is reached by following the tree's guesses and their patterns, repeated letters
+# in the guesses included
+@pytest.mark.parametrize('dictionary', ['small', 'real'])
+def test_tree_plays_every_answer(request, tmp_path, dictionary):
+    index = request.getfixturevalue('small_index' if dictionary == 'small' else 'index')
+    patterns = request.getfixturevalue('small_patterns' if dictionary == 'small' else 'patterns')
+    path = str(tmp_path / 'tree.bin')
+    write_tree(path, index, GuessMode.ELIMINATE, build_tree(index, patterns, GuessMode.ELIMINATE))
+    tree = load_tree(path, index)
+    for answer in index.wordles:
+        game = Game(index, patterns=patterns)
+        node = 0
+        while True:
+            assert node is not None and tree.walk(game.path) == node
+            guess = index.wordles[tree.guess(node)]
+            if guess == answer:
+                break
+            pattern = feedback(guess, answer)
+            game.apply_pattern(tree.guess(node), pattern)
+            node = tree.child(node, pattern)
+
+def test_trees_of_another_dictionary_or_part_of_one_are_not_loaded(tmp_path, small_index, small_patterns, index):
+    path = str(tmp_path / 'tree.bin')
+    write_tree(path, small_index, GuessMode.ELIMINATE, build_tree(small_index, small_patterns, GuessMode.ELIMINATE))
+    assert load_tree(path, index) is None
+
+    members = np.arange(10)
+    solver = OptimalSolver(small_patterns)
+    write_optimal_tree(path, small_index, _strategy_to_json(small_index, solver.strategy(members)))
+    assert load_tree(path, small_index) is None
+
+# lookahead depends on its budget and the machine, so it has no tree
+def test_lookahead_has_no_tree(tmp_path, small_index, small_patterns):
+    with pytest.raises(ValueError):
+        build_tree(small_index, small_patterns, GuessMode.LOOKAHEAD)
+    with pytest.raises(ValueError):
+        fetch_tree(small_index, small_patterns, GuessMode.LOOKAHEAD, cache_dir=str(tmp_path))
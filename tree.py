@@ -0,0 +1,171 @@
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from book import OpeningBook
+from game import Game
+from index import WordleIndex
+from patterns import PATTERNS_CACHE_DIR, Patterns
+from repl import ELIMINATE_MODES, GuessMode, finish_reason, recommend
+
+MAX_TREE_DEPTH = 16
+# the mode of trees written by the optimal solver, which no live mode plays
+OPTIMAL_MODE = 0xff
+TREE_MAGIC = b'WRDLTREE'
+# lookahead answers depend on its time budget and the machine, so like the opening book it is
+# left to search live
+TREE_MODES = [GuessMode.ELIMINATE, GuessMode.ENTROPY, GuessMode.MINIMAX]
+TREE_VERSION = 4
+
+# magic, version, wordle length, starting mode, node count, edge count, digest of the index
+_HEADER = struct.Struct('<8sIIIII32s')
+
+# the strategy of one starting mode played out against every possible answer, with the
+# same switch to finish a game makes; node 0 is the first turn and the layout after the
+# header is, each array starting on an 8 byte boundary:
+#   guesses        int32  (nodes,)      index rank of the guess made at each node
+#   modes          uint8  (nodes,)      the mode that picked it
+#   counts         uint32 (nodes,)      candidates left when it was picked
+#   edge_starts    uint32 (nodes + 1,)  each node's edges are edge_starts[n]:edge_starts[n + 1]
+#   edge_patterns  uint32 (edges,)      the feedback pattern of each edge, ascending within a node
+#   edge_children  int32  (edges,)      the node that pattern leads to
+#
+# lookups read the memory-mapped file through memoryviews, so walking a turn is a bisect
+# over one node's edges without any numpy call overhead
+class DecisionTree:
+    def __init__(self, buffer):
+        _, _, _, mode, node_count, edge_count, self.digest = _HEADER.unpack_from(buffer)
+        self.mode = None if mode == OPTIMAL_MODE else GuessMode(mode)
+        view = memoryview(buffer)
+        offset = _align(_HEADER.size)
+        sections = []
+        for fmt, count in [('i', node_count), ('B', node_count), ('I', node_count), ('I', node_count + 1), ('I', edge_count), ('i', edge_count)]:
+            size = struct.calcsize(fmt) * count
+            sections.append(view[offset:offset + size].cast(fmt))
+            offset = _align(offset + size)
+        self.guesses, self.modes, self.counts, self.edge_starts, self.edge_patterns, self.edge_children = sections
+
+    def __len__(self):
+        return len(self.guesses)
+
+    # None when the tree never saw that pattern after this node's guess
+    def child(self, node, pattern) -> Optional[int]:
+        lo = self.edge_starts[node]
+        hi = self.edge_starts[node + 1]
+        i = bisect_left(self.edge_patterns, pattern, lo, hi)
+        if i == hi or self.edge_patterns[i] != pattern:
+            return None
+        return self.edge_children[i]
+
+    def guess(self, node):
+        return self.guesses[node]
+
+    # the node a game's path leads to, or None once it strays from the tree's guesses
+    def walk(self, path) -> Optional[int]:
+        if path is None:
+            return None
+        node = 0
+        for guess, pattern in path:
+            if self.guesses[node] != guess:
+                return None
+            node = self.child(node, pattern)
+            if node is None:
+                return None
+        return node
+
+# breadth first, so every node's children are numbered (and its edges laid out) together;
+# each node is reached by replaying its path on a fresh game, the opening book covering the
+# expensive first turns. raises ValueError for modes outside TREE_MODES
+def build_tree(index: WordleIndex, patterns: Patterns, mode: GuessMode, book: OpeningBook = None):
+    if mode not in TREE_MODES:
+        raise ValueError(f"no decision tree for {mode.name.lower()} mode, which searches live")
+    guesses, modes, counts, edge_starts, edge_patterns, edge_children = [], [], [], [0], [], []
+    queue = deque([((), mode)])
+    while queue:
+        path, node_mode = queue.popleft()
+        game = _replay(index, patterns, book, path)
+        if node_mode in ELIMINATE_MODES and finish_reason(game) is not None:
+            node_mode = GuessMode.FINISH
+        guess = recommend(game, node_mode)
+        guesses.append(guess)
+        modes.append(node_mode.value)
+        counts.append(game.candidate_count)
+
+        if len(path) + 1 < MAX_TREE_DEPTH:
+            bits = game.candidates_bits
+            for pattern in np.unique(patterns.matrix[guess, game.candidate_indices]).tolist():
+                if pattern == patterns.solved:
+                    continue
+                child_path = path + ((guess, pattern),)
+                child_bits = _replay(index, patterns, book, child_path).candidates_bits
+                # a guess every candidate answers alike leaves the child no narrower, which is
+                # left to live search
+                if child_bits == bits:
+                    continue
+                edge_patterns.append(pattern)
+                edge_children.append(len(guesses) + len(queue))
+                queue.append((child_path, node_mode))
+        edge_starts.append(len(edge_patterns))
+
+    return [
+        np.array(guesses, dtype=np.int32),
+        np.array(modes, dtype=np.uint8),
+        np.array(counts, dtype=np.uint32),
+        np.array(edge_starts, dtype=np.uint32),
+        np.array(edge_patterns, dtype=np.uint32),
+        np.array(edge_children, dtype=np.int32),
+    ]
+
+# raises ValueError for modes outside TREE_MODES, whose trees (if any are left on disk) are ignored
+def fetch_tree(index: WordleIndex, patterns: Patterns, mode: GuessMode, book: OpeningBook = None, cache_dir=PATTERNS_CACHE_DIR):
+    if mode not in TREE_MODES:
+        raise ValueError(f"no decision tree for {mode.name.lower()} mode, which searches live")
+    path = tree_path(mode, index.length, cache_dir)
+    tree = load_tree(path, index)
+    if tree is None:
+        write_tree(path, index, mode, build_tree(index, patterns, mode, book))
+        tree = load_tree(path, index)
+    return tree
+
+def load_tree(path, index: WordleIndex):
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+        return None
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, length, _, _, _, digest = _HEADER.unpack_from(buffer)
+    if magic != TREE_MAGIC or version != TREE_VERSION or length != index.length or digest != index.digest():
+        buffer.close()
+        return None
+    tree = DecisionTree(buffer)
+    # a tree of only some of the answers (an optimal solve with a limit) cannot play a real game
+    if len(tree) == 0 or tree.counts[0] != len(index):
+        return None
+    return tree
+
+def tree_path(mode: GuessMode, length, cache_dir=PATTERNS_CACHE_DIR):
+    return os.path.join(cache_dir, f'tree-{mode.name.lower()}-{length}.bin')
+
+def write_tree(path, index: WordleIndex, mode, sections):
+    guesses, edge_patterns = sections[0], sections[4]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(TREE_MAGIC, TREE_VERSION, index.length, mode if mode == OPTIMAL_MODE else mode.value, len(guesses), len(edge_patterns), index.digest()))
+        for section in sections:
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(section.tobytes())
+    os.replace(tmp_path, path)
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+def _replay(index, patterns, book, path):
+    game = Game(index, patterns=patterns, book=book)
+    for guess, pattern in path:
+        game.apply_pattern(guess, pattern)
+    return game